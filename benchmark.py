@@ -0,0 +1,787 @@
+"""
+Offline benchmarks for the scraper. Everything runs against saved pages in
+fixtures/ or against generated XenForo threads served from a local stand-in
+forum (fixture_utils), never the live site.
+
+    python benchmark.py                                  # full suite
+    python benchmark.py --quick --output results.json    # smaller sizes, saved
+    python benchmark.py --compare results.json           # flag regressions
+    python benchmark.py --only generation report
+
+Results are printed as one JSON line per benchmark and, with --output,
+saved together with the commit and Python version so runs can be compared.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+import threading
+import platform
+import argparse
+import tracemalloc
+import http.server
+
+from scraper_utils import extract_posts, scrape_page
+from fixture_utils import XenForoServer, QuietHTTPServer, make_thread_page
+from search_utils import SearchIndexBuilder
+from classify_utils import LinkClassifier
+
+FIXTURE_BASE_URL = "https://simpcity.cr/threads/example-creator.12345/page-2"
+
+def time_extraction(html_path, base_url=FIXTURE_BASE_URL, rounds=20):
+    """Parses the same page `rounds` times and returns per-page timings in ms."""
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    timings = []
+    posts = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        posts = extract_posts(html, base_url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "fixture": os.path.basename(html_path),
+        "bytes": len(html.encode("utf-8")),
+        "posts": len(posts),
+        "rounds": rounds,
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "min_ms": round(min(timings), 3),
+    }
+
+def time_search_index(html_path, total_posts=50000):
+    """
+    Builds the report search index for a synthetic thread of total_posts posts,
+    made by repeating the fixture's posts with fresh numbers and titles.
+    """
+    with open(html_path, "r", encoding="utf-8") as f:
+        sample = extract_posts(f.read(), FIXTURE_BASE_URL)
+
+    builder = SearchIndexBuilder()
+    for n in range(total_posts):
+        post = dict(sample[n % len(sample)])
+        post["post_number"] = str(n + 1)
+        post["title"] = f"{post['title']} set {n // 7} part {n % 13}"
+        builder.add_post(post, f"page-{n // 500 + 1}.html")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        size = builder.write_js(os.path.join(tmp, "search.js"))
+
+    return {
+        "posts": total_posts,
+        "terms": len(builder.to_dict()["terms"]),
+        "build_seconds": round(builder.build_seconds, 3),
+        "index_bytes": size,
+    }
+
+# Shapes of links seen in real threads, filled in with random ids
+LINK_TEMPLATES = (
+    "https://bunkr.cr/a/{id}",
+    "https://bunkr.cr/f/{id}.mp4",
+    "https://gofile.io/d/{id}",
+    "https://pixeldrain.com/u/{id}?utm_source=forum",
+    "https://mega.nz/folder/{id}#key{id}",
+    "https://www.mediafire.com/file/{id}/pack.zip/file",
+    "https://jpg6.su/img/{id}",
+    "https://simp6.jpg6.su/images3/{id}.md.jpg",
+    "https://simp7.jpg7.cr/images3/{id}.jpg",
+    "https://simpcity.cr/threads/example.{id}/post-123",
+    "https://simpcity.cr/members/someone.{id}/",
+    "javascript:",
+    "https://www.instagram.com/{id}/",
+    "https://onlyfans.com/{id}",
+    "https://x.com/{id}/status/1",
+)
+
+def make_link_corpus(size=1000000, seed=1):
+    rng = random.Random(seed)
+    return [
+        rng.choice(LINK_TEMPLATES).format(id=f"{rng.getrandbits(40):x}")
+        for _ in range(size)
+    ]
+
+def _legacy_is_external(l):
+    # The filter scrape_page used before the classifier
+    return not re.search(r"simpcity|#|javascript", l, re.I) and not ("jpg6.su" in l and "/img/" in l) and not ("jpg7.cr" in l and "/img/" in l)
+
+def time_link_classification(size=1000000):
+    """Per-URL cost of the compiled classifier against the old inline filter."""
+    links = make_link_corpus(size)
+    classifier = LinkClassifier()
+
+    start = time.perf_counter()
+    legacy = [_legacy_is_external(l) for l in links]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [classifier.is_external(l) for l in links]
+    compiled_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    images = [classifier.is_real_image(l) for l in links]
+    image_seconds = time.perf_counter() - start
+
+    return {
+        "links": size,
+        "legacy_ns_per_link": round(legacy_seconds / size * 1e9),
+        "classifier_ns_per_link": round(compiled_seconds / size * 1e9),
+        "is_real_image_ns_per_link": round(image_seconds / size * 1e9),
+        "disagreements": sum(a != b for a, b in zip(legacy, compiled)),
+        "images": sum(images),
+    }
+
+COLD_START_COMMANDS = {
+    "cli": "import cli; cli.build_parser()",
+    "gui": "import main",
+}
+
+def time_cold_start(rounds=5):
+    """
+    Times a fresh interpreter importing the CLI against one importing the GUI
+    (which is everything main_gui needs before the window opens).
+    Reports the median of several runs so disk caches are warm for both.
+    """
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    result = {"rounds": rounds}
+    for name, code in COLD_START_COMMANDS.items():
+        runs = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", code], cwd=script_dir,
+                                  capture_output=True, text=True)
+            runs.append(time.perf_counter() - start)
+            if proc.returncode != 0:
+                result[f"{name}_error"] = _failure(proc)
+                break
+        result[f"{name}_seconds"] = round(sorted(runs)[len(runs) // 2], 4)
+    return result
+
+class StaticPage:
+    """Just enough of a WebDriver for scrape_page: the page source and its URL."""
+
+    def __init__(self, html, url):
+        self.page_source = html
+        self.current_url = url
+
+def time_generated_extraction(pages=20, posts_per_page=20, images_per_post=4, spoilers_per_post=1,
+                              links_per_post=3):
+    """Runs scrape_page over generated thread pages of the given shape."""
+    url = "https://simpcity.cr/threads/bench-thread.1/page-{}"
+    html_pages = [make_thread_page(page=n, pages=pages, posts_per_page=posts_per_page,
+                                   images_per_post=images_per_post, spoilers_per_post=spoilers_per_post,
+                                   links_per_post=links_per_post) for n in range(1, pages + 1)]
+    posts = 0
+    timings = []
+    for n, html in enumerate(html_pages, 1):
+        start = time.perf_counter()
+        posts += len(scrape_page(StaticPage(html, url.format(n))))
+        timings.append(time.perf_counter() - start)
+    return {
+        "pages": pages,
+        "posts_per_page": posts_per_page,
+        "images_per_post": images_per_post,
+        "links_per_post": links_per_post,
+        "kb_per_page": round(sum(map(len, html_pages)) / pages / 1024, 1),
+        "mean_ms": round(sum(timings) / pages * 1000, 3),
+        "posts_per_second": round(posts / sum(timings), 1),
+    }
+
+def generated_posts(pages, posts_per_page=20, links_per_post=3, slug="bench-thread"):
+    """Posts as the scraper would return them for a generated thread."""
+    posts = []
+    for n in range(1, pages + 1):
+        html = make_thread_page(slug, page=n, pages=pages, posts_per_page=posts_per_page,
+                                links_per_post=links_per_post)
+        posts.extend(extract_posts(html, f"https://simpcity.cr/threads/{slug}.1/page-{n}"))
+    return posts
+
+def time_link_filtering(pages=200, posts_per_page=20, links_per_post=3):
+    """
+    Runs each link_filter over a generated thread twice, as run_generation
+    applies it: once as its own thread, then again as a second thread
+    reposting the same links, where the link index of "new" drops them all.
+    """
+    from dedup_utils import LINK_FILTERS, LinkIndex, filter_links
+
+    posts = generated_posts(pages, posts_per_page, links_per_post)
+    links = sum(len(post["external_links"]) for post in posts)
+    result = {"posts": len(posts), "links": links}
+    for link_filter in LINK_FILTERS:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = LinkIndex(os.path.join(tmp, "links.db")) if link_filter == "new" else None
+            start = time.perf_counter()
+            kept = 0
+            for thread in ("bench-thread", "bench-repost"):
+                shown = set()
+                for n in range(0, len(posts), posts_per_page):
+                    page = [dict(post) for post in posts[n:n + posts_per_page]]
+                    kept += sum(len(post["external_links"]) for post in filter_links(page, link_filter, index, thread, shown))
+            wall = time.perf_counter() - start
+            if index is not None:
+                index.close()
+        result[f"{link_filter}_seconds"] = round(wall, 3)
+        result[f"{link_filter}_links_per_second"] = round(2 * links / wall, 1)
+        result[f"{link_filter}_kept"] = kept
+    return result
+
+def time_generation(pages=50, posts_per_page=20, http_workers=8, delay=0.0, output_format="json"):
+    """
+    End-to-end run_generation in http mode against the local stand-in forum:
+    logs in through its login form, stores the session like a browser login
+    would, then scrapes a generated thread of `pages` pages.
+    """
+    import requests
+    from login_utils import save_session
+    from generation_utils import run_generation
+
+    with XenForoServer(pages=pages, posts_per_page=posts_per_page, delay=delay) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        session = requests.Session()
+        if not server.login(session):
+            return {"error": "login to the stand-in forum failed"}
+        cookies = [{"name": c.name, "value": c.value, "domain": c.domain or "127.0.0.1", "path": c.path}
+                   for c in session.cookies]
+        config_dir = os.path.join(tmp, "config")
+        save_session(os.path.join(config_dir, "session.json"), cookies, server.username)
+        config_path = os.path.join(config_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "username": server.username,
+                "password": server.password,
+                "output_directory": os.path.join(tmp, "output"),
+                "fetch_mode": "http",
+                "http_workers": http_workers,
+                "session_check_url": server.url + "/account/",
+                "output_format": output_format,
+            }, f)
+        from link_utils import generate_links
+        urls_file = os.path.join(config_dir, "urls.txt")
+        with open(urls_file, "w") as f:
+            f.write("\n".join(generate_links(server.thread_url(), pages)) + "\n")
+
+        start = time.perf_counter()
+        output = run_generation(config_path, urls_file, log_message=lambda msg: None)
+        wall = time.perf_counter() - start
+        from output_utils import iter_posts
+        posts = sum(1 for _ in iter_posts(output))
+        return {
+            "pages": pages,
+            "posts": posts,
+            "http_workers": http_workers,
+            "server_delay_ms": delay * 1000,
+            "output_format": output_format,
+            "seconds": round(wall, 3),
+            "pages_per_second": round(pages / wall, 1),
+            "requests": server.requests,
+            "mb_served": round(server.bytes_sent / 1024 / 1024, 2),
+        }
+
+def time_report(posts=20000, posts_per_page=500):
+    """Renders the paginated HTML report for a generated thread, with its peak Python memory."""
+    from report_utils import render_report
+    from output_utils import write_json_array
+
+    sample = generated_posts(max(1, min(50, posts // 20)))
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "bench.json")
+        write_json_array((dict(sample[n % len(sample)], post_number=str(n + 1)) for n in range(posts)), input_path)
+        tracemalloc.start()
+        start = time.perf_counter()
+        render_report(input_path, posts_per_page)
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        output_kb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / 1024
+    return {
+        "posts": posts,
+        "posts_per_page": posts_per_page,
+        "seconds": round(wall, 3),
+        "peak_python_mb": round(peak / 1024 / 1024, 1),
+        "output_kb": round(output_kb),
+    }
+
+class ThrottlingServer:
+    """
+    Local stand-in for the forum that rate-limits like a real one: it serves
+    the fixture page for any thread URL, answers 429 with Retry-After when
+    more than `capacity` requests are in flight, and slows down as it nears
+    capacity.
+    """
+
+    def __init__(self, html, capacity=4, delay=0.02, retry_after=0.2):
+        self.html = html.encode("utf-8")
+        self.capacity = capacity
+        self.delay = delay
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.served = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.in_flight += 1
+                    busy = server.in_flight
+                try:
+                    if busy > server.capacity:
+                        with server._lock:
+                            server.throttled += 1
+                        self.send_response(429)
+                        self.send_header("Retry-After", str(server.retry_after))
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    time.sleep(server.delay * busy)
+                    body = server.page(self.path)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    with server._lock:
+                        server.served += 1
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def page(self, path):
+        return self.html
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def time_adaptive_fetch(html_path, pages=200, capacity=4, workers=16):
+    """
+    Fetches `pages` pages from a ThrottlingServer with a fixed pool of
+    `workers` (fetch_utils) and with the adaptive per-host limiter
+    (throttle_utils), and compares throughput and 429s.
+    """
+    import requests
+    from fetch_utils import fetch_pages
+    from throttle_utils import SharedFetcher
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    result = {"pages": pages, "capacity": capacity, "workers": workers}
+    for name in ("fixed", "adaptive"):
+        with ThrottlingServer(html, capacity) as server:
+            urls = [f"{server.url}/threads/bench.1/page-{n}" for n in range(1, pages + 1)]
+            session = requests.Session()
+            session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=workers))
+            start = time.perf_counter()
+            if name == "fixed":
+                fetched = list(fetch_pages(session, urls, max_workers=workers))
+            else:
+                fetcher = SharedFetcher(session, max_workers=workers, max_per_host=workers)
+                fetched = list(fetcher.fetch_pages(urls))
+                fetcher.close()
+                result["adaptive_final_limit"] = fetcher.limiters.for_url(server.url).limit
+            wall = time.perf_counter() - start
+            result[f"{name}_seconds"] = round(wall, 3)
+            result[f"{name}_pages_ok"] = sum(1 for _, page in fetched if page is not None)
+            result[f"{name}_throttled"] = server.throttled
+    return result
+
+class LinkHostServer:
+    """
+    Local stand-in for a file host: /alive/... answers 200, /dead/... 404 and
+    /nohead/... refuses HEAD (405) but answers a ranged GET with 206, each
+    after `delay` seconds. Connections are kept alive like a real host's.
+    """
+
+    def __init__(self, delay=0.02):
+        server = self
+        self.delay = delay
+        self.requests = 0
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def answer(self, status):
+                server.requests += 1
+                time.sleep(server.delay)
+                self.send_response(status)
+                self.send_header("Content-Length", "1" if status == 206 else "0")
+                self.end_headers()
+                if status == 206:
+                    self.wfile.write(b"x")
+
+            def do_HEAD(self):
+                if self.path.startswith("/nohead/"):
+                    self.answer(405)
+                else:
+                    self.answer(200 if self.path.startswith("/alive/") else 404)
+
+            def do_GET(self):
+                self.answer(206 if self.path.startswith(("/alive/", "/nohead/")) else 404)
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def time_link_check(links=20000, hosts=4, delay=0.02, per_host=8):
+    """
+    Checks `links` links spread over `hosts` local stand-in hosts (a third
+    dead, a third refusing HEAD), then checks them again to time the cached
+    re-run.
+    """
+    from contextlib import ExitStack
+    from linkcheck_utils import check_links
+
+    kinds = ("alive", "dead", "nohead")
+    with ExitStack() as stack:
+        servers = [stack.enter_context(LinkHostServer(delay)) for _ in range(hosts)]
+        urls = [f"{servers[n % hosts].url}/{kinds[n % 3]}/file-{n}" for n in range(links)]
+        cache = {}
+        start = time.perf_counter()
+        checked = check_links(urls, cache, max_workers=hosts * per_host, per_host=per_host)
+        wall = time.perf_counter() - start
+        start = time.perf_counter()
+        rechecked = check_links(urls, cache, max_workers=hosts * per_host, per_host=per_host)
+        cached_wall = time.perf_counter() - start
+        requests_made = sum(server.requests for server in servers)
+
+    states = {}
+    for state, _, _ in cache.values():
+        states[state] = states.get(state, 0) + 1
+    return {
+        "links": links,
+        "hosts": hosts,
+        "per_host": per_host,
+        "server_delay_ms": delay * 1000,
+        "checked": checked,
+        "seconds": round(wall, 2),
+        "links_per_second": round(checked / wall, 1),
+        "requests": requests_made,
+        "states": states,
+        "rechecked": rechecked,
+        "cached_seconds": round(cached_wall, 3),
+    }
+
+ASSET_SIZES = {
+    ".jpg": 150 * 1024, ".png": 20 * 1024, ".webp": 120 * 1024,
+    ".woff2": 60 * 1024, ".mp4": 2 * 1024 * 1024, ".js": 30 * 1024,
+}
+
+class AssetPageServer:
+    """
+    Serves the fixture page with its images pointed back at this server,
+    plus a web font, an autoplaying video preview and an analytics script
+    like a real thread page has. Counts the bytes sent, so a page load's
+    weight can be compared between browser profiles.
+    """
+
+    def __init__(self, html):
+        server = self
+        self.bytes_sent = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/threads/"):
+                    body, kind = server.page().encode("utf-8"), "text/html; charset=utf-8"
+                else:
+                    ext = os.path.splitext(path)[1]
+                    body, kind = b"\0" * ASSET_SIZES.get(ext, 1024), "application/octet-stream"
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent += len(body)
+                    server.requests += 1
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        extras = (
+            '<style>@font-face { font-family: "Forum"; src: url("/fonts/forum.woff2"); }'
+            ' body { font-family: "Forum", sans-serif; }</style>'
+            f'<script src="{self.url}/www.googletagmanager.com/gtag.js"></script>'
+        )
+        video = '<video src="/media/preview.mp4" autoplay muted loop></video>'
+        html = re.sub(r'src="https?://[^/"]+/', 'src="/ext/', html)
+        self.html = html.replace("</head>", extras + "</head>", 1).replace("</body>", video + "</body>", 1)
+
+    def page(self):
+        return self.html
+
+    def reset(self):
+        with self._lock:
+            self.bytes_sent = 0
+            self.requests = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def time_browser_profiles(html_path, rounds=5, headless=True):
+    """
+    Loads the fixture page through Edge with each browser profile and reports
+    the bytes served, requests and load time per page, plus browser memory.
+    Needs Edge; without it the error is reported instead.
+    """
+    from driver_utils import create_driver, driver_memory_mb, BROWSER_PROFILES
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    result = {"rounds": rounds, "headless": headless}
+    with AssetPageServer(html) as server:
+        for profile in BROWSER_PROFILES:
+            try:
+                driver = create_driver(profile, headless)
+            except Exception as e:
+                result["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                return result
+            try:
+                load_seconds, page_bytes, page_requests = [], [], []
+                for n in range(rounds):
+                    # A fresh URL each time so nothing comes from the page cache
+                    url = f"{server.url}/threads/example-creator.12345/page-{n + 2}"
+                    server.reset()
+                    start = time.perf_counter()
+                    driver.get(url)
+                    load_seconds.append(time.perf_counter() - start)
+                    time.sleep(0.5)  # let the video preview and late requests land
+                    page_bytes.append(server.bytes_sent)
+                    page_requests.append(server.requests)
+                memory = driver_memory_mb(driver)
+            finally:
+                driver.quit()
+            result[profile] = {
+                "load_ms": round(sorted(load_seconds)[len(load_seconds) // 2] * 1000, 1),
+                "kb_per_page": round(sum(page_bytes) / len(page_bytes) / 1024, 1),
+                "requests_per_page": round(sum(page_requests) / len(page_requests), 1),
+                "memory_mb": memory,
+            }
+    return result
+
+def time_driver_pool(pages=20, workers=4, headless=True, profile="default"):
+    """
+    Scrapes a generated thread from the local stand-in forum with
+    run_driver_pool, once with a single browser and once with `workers`, and
+    reports the measured speedup of the pool over one browser.
+    Needs Edge; without it the error is reported instead.
+    """
+    from driver_utils import create_driver, run_driver_pool
+    from wait_utils import wait_for_posts
+
+    result = {"pages": pages, "workers": workers, "headless": headless, "profile": profile}
+    with XenForoServer(pages=pages) as server:
+        urls = [server.thread_url() + ("/" if n == 1 else f"/page-{n}") for n in range(1, pages + 1)]
+
+        def start_driver(worker_id):
+            driver = create_driver(profile, headless)
+            # Log in by setting the forum's session cookie, like a stored session
+            driver.get(server.url + "/robots.txt")
+            driver.add_cookie({"name": "xf_user", "value": server.token, "path": "/"})
+            return driver
+
+        def scrape_url(driver, index, url):
+            driver.get(url)
+            wait_for_posts(driver, 15)
+            return scrape_page(driver)
+
+        for count in (1, workers):
+            try:
+                results, stats = run_driver_pool(urls, count, start_driver, scrape_url)
+            except Exception as e:
+                result["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                return result
+            result[f"workers_{count}"] = {
+                "wall_seconds": stats["wall_seconds"],
+                "pages_per_second": stats["pages_per_second"],
+                "parallelism": stats["parallelism"],
+                "posts": sum(len(page) for page in results),
+            }
+    one, many = result["workers_1"]["wall_seconds"], result[f"workers_{workers}"]["wall_seconds"]
+    result["speedup"] = round(one / many, 2) if many else None
+    return result
+
+# Opens the GUI, lets Tk draw the first frame, then closes it instead of
+# entering the main loop
+FIRST_WINDOW_CODE = """
+import ttkbootstrap as tb
+def first_frame(self):
+    self.update()
+    self.destroy()
+tb.Window.mainloop = first_frame
+import main
+main.main_gui()
+"""
+
+def time_first_window(rounds=5):
+    """
+    Times a fresh interpreter from start until the main window has drawn its
+    first frame. Needs a display; without one the error is reported instead.
+    """
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    result = {"rounds": rounds}
+    runs = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", FIRST_WINDOW_CODE], cwd=script_dir,
+                              capture_output=True, text=True)
+        runs.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            result["error"] = _failure(proc)
+            break
+    result["seconds"] = round(sorted(runs)[len(runs) // 2], 4)
+    return result
+
+def suite(fixture, quick=False):
+    """Name and zero-argument function of every benchmark, sized for a full or a quick run."""
+    scale = 10 if quick else 1
+    return [
+        ("extraction", lambda: time_extraction(fixture)),
+        ("generated_extraction", lambda: time_generated_extraction(pages=20 // (2 if quick else 1))),
+        ("link_classification", lambda: time_link_classification(1000000 // scale)),
+        ("link_filtering", lambda: time_link_filtering(pages=200 // scale)),
+        ("search_index", lambda: time_search_index(fixture, 50000 // scale)),
+        ("generation", lambda: time_generation(pages=100 // scale * 2)),
+        ("report", lambda: time_report(posts=20000 // scale)),
+        ("adaptive_fetch", lambda: time_adaptive_fetch(fixture, pages=200 // scale * 2)),
+        ("link_check", lambda: time_link_check(links=20000 // scale)),
+        ("browser_profiles", lambda: time_browser_profiles(fixture, rounds=5 if not quick else 2)),
+        ("driver_pool", lambda: time_driver_pool(pages=20 // (2 if quick else 1))),
+        ("cold_start", lambda: time_cold_start(5 if not quick else 3)),
+        ("first_window", lambda: time_first_window(5 if not quick else 3)),
+    ]
+
+def run_metadata():
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=script_dir,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+# Metrics where a smaller number is better, by name ending; anything
+# "per_second" is better when larger. Other fields are sizes and counts.
+LOWER_IS_BETTER = ("_ms", "_ns_per_link", "seconds", "_mb", "kb_per_page", "index_bytes")
+
+def _failure(proc):
+    """Last line of a failed subprocess's stderr, or its exit code when it printed nothing."""
+    lines = proc.stderr.strip().splitlines()
+    return lines[-1] if lines else f"exit code {proc.returncode}"
+
+def _flatten(result, prefix=""):
+    """{"a": {"b": 1}} as {"a.b": 1}, so nested metrics can be compared too."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def compare_results(old, new, threshold=0.1):
+    """
+    Lists the metrics in `new` that are more than `threshold` (a fraction)
+    worse than in `old`, as (benchmark, metric, old value, new value).
+    Nested metrics are named by their path, e.g. "lean.kb_per_page".
+    """
+    regressions = []
+    for name, result in new["results"].items():
+        before = _flatten(old.get("results", {}).get(name) or {})
+        for metric, value in _flatten(result).items():
+            previous = before.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or not previous:
+                continue
+            if "per_second" in metric:
+                worse = value < previous * (1 - threshold)
+            elif metric.endswith(LOWER_IS_BETTER):
+                worse = value > previous * (1 + threshold)
+            else:
+                continue
+            if worse:
+                regressions.append((name, metric, previous, value))
+    return regressions
+
+def main(argv=None):
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scraper.")
+    parser.add_argument("fixtures", nargs="*", help="saved thread pages to time extraction on")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast check")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="how much worse (as a fraction) counts as a regression, default 0.1")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures or [os.path.join(script_dir, "fixtures", "xenforo_thread_page.html")]
+    benchmarks = suite(fixtures[0], args.quick)
+    if args.only:
+        unknown = set(args.only) - {name for name, _ in benchmarks}
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+        benchmarks = [(name, run) for name, run in benchmarks if name in args.only]
+
+    results = {"meta": run_metadata(), "results": {}}
+    results["meta"]["quick"] = args.quick
+    for name, run in benchmarks:
+        runs = [time_extraction(path) for path in fixtures] if name == "extraction" else [run()]
+        for n, result in enumerate(runs):
+            key = name if n == 0 else f"{name}_{n + 1}"
+            results["results"][key] = result
+            print(json.dumps({"benchmark": key, **result}), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        regressions = compare_results(old, results, args.threshold)
+        for name, metric, before, after in regressions:
+            print(f"REGRESSION {name}.{metric}: {before} -> {after}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
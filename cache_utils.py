@@ -0,0 +1,74 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+SCRAPE_MODES = ("full", "resume", "refresh")
+
+def get_cache_dir(output_directory, folder_name):
+    """Per-thread folder holding one checkpoint file per scraped page."""
+    return os.path.join(output_directory, ".page_cache", folder_name)
+
+def _cache_path(cache_dir, url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.json")
+
+def load_entry(cache_dir, url):
+    """Returns the cache entry for a URL, or None if it hasn't been scraped yet."""
+    try:
+        with open(_cache_path(cache_dir, url), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if entry.get("url") != url:
+        return None
+    return entry
+
+def load_page(cache_dir, url):
+    """Returns the cached posts for a URL, or None if it hasn't been scraped yet."""
+    entry = load_entry(cache_dir, url)
+    return entry.get("posts") if entry else None
+
+def save_page(cache_dir, url, posts, last_page=False):
+    """
+    Checkpoints one page's posts. last_page marks the thread's final page at
+    scrape time, which refresh mode re-scrapes. The write is atomic so a
+    crash never leaves half a file.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, url)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    entry = {"url": url, "scraped_at": time.time(), "last_page": last_page, "posts": posts}
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def plan_pages(cache_dir, urls, mode="full"):
+    """
+    Splits the URLs into pages that must be scraped and pages served from the cache.
+
+    full     scrape everything (each page is still checkpointed)
+    resume   skip every page that is already cached
+    refresh  like resume, but re-scrape the last page, and any page that was the
+             last one when it was cached, since those may still have been growing
+
+    Returns (indexes_to_scrape, cached_indexes). Cached posts are not loaded
+    here; read them with load_page when they are needed.
+    """
+    if mode not in SCRAPE_MODES:
+        raise ValueError(f"Unknown scrape_mode '{mode}', expected one of {', '.join(SCRAPE_MODES)}.")
+
+    to_scrape = []
+    cached = []
+    last_index = len(urls) - 1
+    for i, url in enumerate(urls):
+        if mode == "full" or (mode == "refresh" and i == last_index):
+            to_scrape.append(i)
+            continue
+        entry = load_entry(cache_dir, url)
+        if entry is None or (mode == "refresh" and entry.get("last_page")):
+            to_scrape.append(i)
+        else:
+            cached.append(i)
+    return to_scrape, cached
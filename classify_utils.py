@@ -0,0 +1,123 @@
+import re
+import json
+
+
+INTERNAL = "internal"
+IMAGE_HOST = "image_host"
+FILE_HOST = "file_host"
+OTHER = "other"
+
+# Default rules, matching what scrape_page has always filtered. A
+# config/link_rules.json file can override any of these keys; its "hosts"
+# are merged into the defaults (see merge_rules).
+DEFAULT_RULES = {
+    # Anywhere in the URL, case-insensitive: forum links, anchors and script links
+    "internal_patterns": ["simpcity", "#", "javascript"],
+    # Host (and any subdomain of it) -> category, optionally only under a path prefix
+    "hosts": [
+        {"host": "jpg6.su", "path": "/img/", "category": IMAGE_HOST},
+        {"host": "jpg7.cr", "path": "/img/", "category": IMAGE_HOST},
+        {"host": "bunkr.cr", "category": FILE_HOST},
+        {"host": "bunkr.si", "category": FILE_HOST},
+        {"host": "bunkrr.su", "category": FILE_HOST},
+        {"host": "cyberdrop.me", "category": FILE_HOST},
+        {"host": "gofile.io", "category": FILE_HOST},
+        {"host": "pixeldrain.com", "category": FILE_HOST},
+        {"host": "mega.nz", "category": FILE_HOST},
+        {"host": "mediafire.com", "category": FILE_HOST},
+        {"host": "saint2.su", "category": FILE_HOST},
+        {"host": "turbo.cr", "category": FILE_HOST},
+    ],
+    # Categories left out of a post's external_links
+    "excluded_categories": [INTERNAL, IMAGE_HOST],
+    "image_extensions": [".jpg", ".jpeg", ".webp"],
+    # Archive thumbnails and icons that only look like images
+    "image_exclusions": [".rar.", ".zip.", ".7z.", ".ico"],
+}
+
+class LinkClassifier:
+    """
+    Sorts URLs into internal, image host, file host or other in one pass.
+    The URL is lowercased once and checked for the internal patterns with
+    plain substring tests; its host is then cut out with a small regex and
+    looked up in the host table, dropping one subdomain at a time so the
+    most specific known host wins. Image extensions and exclusions are one
+    compiled regex each.
+    """
+
+    def __init__(self, rules=None):
+        rules = merge_rules(rules)
+        self._internal_patterns = tuple(p.lower() for p in rules["internal_patterns"])
+        self._hosts = {}
+        for rule in rules["hosts"]:
+            self._hosts.setdefault(rule["host"].lower(), []).append((rule.get("path"), rule["category"]))
+        self.excluded_categories = frozenset(rules["excluded_categories"])
+        self._image_ext_re = re.compile(
+            "(?:" + "|".join(re.escape(e) for e in rules["image_extensions"]) + ")$", re.I
+        )
+        self._image_exclusion_re = _alternation(rules["image_exclusions"])
+
+    def classify(self, url):
+        lowered = url.lower()
+        for pattern in self._internal_patterns:
+            if pattern in lowered:
+                return INTERNAL
+        match = _AUTHORITY_RE.match(lowered)
+        if match is None:
+            return OTHER
+        host = match.group(1)
+        path = url[match.end(1):match.end()]
+        while True:
+            rules = self._hosts.get(host)
+            if rules is not None:
+                for prefix, category in rules:
+                    if prefix is None or path.startswith(prefix):
+                        return category
+                return OTHER
+            dot = host.find(".")
+            if dot < 0:
+                return OTHER
+            host = host[dot + 1:]
+
+    def is_external(self, url):
+        return self.classify(url) not in self.excluded_categories
+
+    def is_real_image(self, url):
+        if not url or not self._image_ext_re.search(url):
+            return False
+        return self._image_exclusion_re is None or not self._image_exclusion_re.search(url)
+
+def merge_rules(rules=None):
+    """
+    The default rules with `rules` on top. Host rules are merged by host and
+    path: a rule for the same host and path replaces the built-in one, any
+    other is added to them. Every other key replaces the default outright.
+    """
+    rules = rules or {}
+    merged = dict(DEFAULT_RULES, **rules)
+    hosts = {(rule["host"].lower(), rule.get("path")): rule for rule in DEFAULT_RULES["hosts"]}
+    for rule in rules.get("hosts", []):
+        hosts[(rule["host"].lower(), rule.get("path"))] = rule
+    merged["hosts"] = list(hosts.values())
+    return merged
+
+# Scheme, then the host (after any user info, before any port) and the path
+_AUTHORITY_RE = re.compile(r"[a-z][a-z0-9+.\-]*://(?:[^@/?#]*@)?([^/?#:]*)[^/?#]*([^?#]*)")
+
+def _alternation(literals):
+    if not literals:
+        return None
+    return re.compile("|".join(re.escape(s) for s in literals), re.I)
+
+def load_classifier(rules_path=None):
+    """Builds a classifier from the defaults plus an optional JSON rules file."""
+    rules = {}
+    if rules_path:
+        try:
+            with open(rules_path, "r", encoding="utf-8") as f:
+                rules = json.load(f)
+        except FileNotFoundError:
+            pass
+    return LinkClassifier(rules)
+
+default_classifier = LinkClassifier()
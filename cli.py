@@ -0,0 +1,290 @@
+"""
+Command-line entry point for headless and scheduled runs. Works from the same
+config/config.json and config/urls.txt as the GUI, without importing tkinter.
+
+    python cli.py links https://simpcity.cr/threads/example.12345 --pages 47
+    python cli.py links https://simpcity.cr/threads/example.12345
+    python cli.py content
+    python cli.py report output/example.json --per-page 500
+    python cli.py check output/example.json
+    python cli.py all https://simpcity.cr/threads/example.12345 --pages 47
+    python cli.py watch https://simpcity.cr/threads/a.1 https://simpcity.cr/threads/b.2 --interval 60
+    python cli.py batch --file threads.txt
+
+Without --pages the page count is read from the thread itself. watch checks
+each thread for new pages, then scrapes only the new pages and the old last
+page, and repeats every --interval minutes (once with --interval 0).
+
+With --json-progress every log line, progress update and the final result is
+printed as one JSON object per line. Exit codes:
+0 success, 1 the step failed, 2 bad arguments, 3 no URLs to scrape.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NO_URLS = 3
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+class Reporter:
+    """Prints log and progress lines as plain text or as JSON lines."""
+
+    def __init__(self, json_lines=False):
+        self.json_lines = json_lines
+
+    def emit(self, event, **fields):
+        if self.json_lines:
+            print(json.dumps({"event": event, "time": round(time.time(), 3), **fields}), flush=True)
+        elif event == "log":
+            print(fields["message"], flush=True)
+        elif event == "error":
+            print(f"Error: {fields['message']}", file=sys.stderr, flush=True)
+        elif event == "done":
+            print(f"Done: {fields.get('output') or fields['step']}", flush=True)
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def progress(self, done, total):
+        # Plain-text runs already get a log line per page
+        if self.json_lines:
+            self.emit("progress", done=done, total=total)
+
+def watch_state_path(config_path):
+    return os.path.join(os.path.dirname(config_path), "watch_state.json")
+
+def discover(config_path, base_url, reporter):
+    """Returns the thread's page links with the count read from the site, or None."""
+    from link_utils import discover_links, discovery_session, load_watch_state, save_watch_state, thread_url
+
+    state_path = watch_state_path(config_path)
+    state = load_watch_state(state_path)
+    links = discover_links(discovery_session(config_path), base_url, state)
+    if links is None:
+        reporter.emit("error", step="discover", message=f"Could not read the page count of {base_url}")
+        return None
+    save_watch_state(state_path, state)
+    reporter.log(f"{thread_url(base_url)} has {len(links)} page(s).")
+    return links
+
+def write_links(base_url, pages, urls_file, reporter, config_path=None):
+    from link_utils import generate_links
+
+    if pages:
+        links = generate_links(base_url, pages)
+    else:
+        links = discover(config_path, base_url, reporter)
+        if links is None:
+            return EXIT_ERROR
+    os.makedirs(os.path.dirname(urls_file) or ".", exist_ok=True)
+    with open(urls_file, "w") as f:
+        f.write("\n".join(links) + "\n")
+    reporter.log(f"Wrote {len(links)} links to {urls_file}")
+    reporter.emit("done", step="links", output=urls_file, count=len(links))
+    return EXIT_OK
+
+def content_done(output):
+    """Fields of a content step's done event: the output file and its trace, when one was saved."""
+    from trace_utils import trace_path
+
+    fields = {"step": "content", "output": output}
+    if output and os.path.exists(trace_path(output)):
+        fields["trace"] = trace_path(output)
+    return fields
+
+def write_content(config_path, urls_file, reporter):
+    from generation_utils import run_generation
+
+    output = run_generation(config_path, urls_file, reporter.log, reporter.progress)
+    if output is None:
+        return EXIT_NO_URLS
+    reporter.emit("done", **content_done(output))
+    return EXIT_OK
+
+def write_report(input_path, per_page, reporter):
+    from report_utils import render_report
+
+    output = render_report(input_path, per_page)
+    reporter.log(f"Generated report: {output}")
+    reporter.emit("done", step="report", output=output)
+    return EXIT_OK
+
+def check_output(config_path, input_path, reporter):
+    from linkcheck_utils import check_file
+
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(input_path)), ".link_status.json")
+    counts = check_file(
+        input_path,
+        cache_path,
+        float(config.get("link_check_ttl_hours", 24)) * 3600,
+        int(config.get("link_check_workers", 32)),
+        int(config.get("link_check_per_host", 4)),
+        log_message=reporter.log,
+    )
+    reporter.log(f"Links: {counts['alive']} alive, {counts['dead']} dead, {counts['unknown']} unknown")
+    reporter.emit("done", step="check", output=input_path, **counts)
+    return EXIT_OK
+
+def watch_threads(config_path, threads, interval, report_per_page, reporter):
+    """
+    Checks each thread for new pages and scrapes what changed, every
+    interval minutes until interrupted (or once when interval is 0).
+    """
+    from generation_utils import run_generation, get_folder_name
+    from link_utils import discover_links, discovery_session, load_watch_state, save_watch_state, thread_url
+
+    state_path = watch_state_path(config_path)
+    watch_dir = os.path.join(os.path.dirname(config_path), "watch")
+    os.makedirs(watch_dir, exist_ok=True)
+    while True:
+        failed = 0
+        session = discovery_session(config_path)
+        state = load_watch_state(state_path)
+        for url in threads:
+            base_url = thread_url(url)
+            links = discover_links(session, base_url, state)
+            if links is None:
+                failed += 1
+                reporter.emit("error", step="watch", message=f"Could not read the page count of {base_url}")
+                continue
+            save_watch_state(state_path, state)
+            previous = state[base_url]["previous_last_page"]
+            reporter.log(f"{base_url}: {len(links)} page(s), {previous} at the last check.")
+            reporter.emit("thread", url=base_url, last_page=len(links), previous_last_page=previous)
+
+            # Each thread gets its own URL list so urls.txt is left alone
+            urls_file = os.path.join(watch_dir, get_folder_name(base_url) + ".txt")
+            with open(urls_file, "w") as f:
+                f.write("\n".join(links) + "\n")
+            try:
+                # refresh re-scrapes the cached last page plus anything not cached yet
+                output = run_generation(config_path, urls_file, reporter.log, reporter.progress,
+                                        overrides={"scrape_mode": "refresh"})
+                reporter.emit("done", **content_done(output))
+                if report_per_page is not None:
+                    write_report(output, report_per_page, reporter)
+            except Exception as e:
+                failed += 1
+                reporter.emit("error", step="watch", message=f"{base_url}: {e}")
+
+        if interval <= 0:
+            return EXIT_ERROR if failed else EXIT_OK
+        reporter.log(f"Next check in {interval:g} minute(s).")
+        time.sleep(interval * 60)
+
+def run_batch(config_path, threads, threads_file, report_per_page, reporter):
+    from job_utils import run_jobs, read_thread_list
+
+    entries = [(url, None) for url in threads]
+    if threads_file:
+        entries += read_thread_list(threads_file)
+    if not entries:
+        reporter.log("No threads given.")
+        return EXIT_NO_URLS
+    results = run_jobs(config_path, entries, reporter.log, reporter.progress)
+    failed = 0
+    for result in results:
+        if result["error"] is not None:
+            failed += 1
+            reporter.emit("error", step="batch", message=f"{result['thread']}: {result['error']}")
+            continue
+        reporter.emit("done", thread=result["thread"], **content_done(result["output"]))
+        if report_per_page is not None and result["output"]:
+            write_report(result["output"], report_per_page, reporter)
+    return EXIT_ERROR if failed else EXIT_OK
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run SimpDL without the GUI.")
+    parser.add_argument("--config", default=os.path.join(SCRIPT_DIR, "config", "config.json"),
+                        help="path to config.json")
+    parser.add_argument("--urls", default=os.path.join(SCRIPT_DIR, "config", "urls.txt"),
+                        help="path to urls.txt")
+    parser.add_argument("--json-progress", action="store_true",
+                        help="print one JSON object per event instead of plain text")
+    steps = parser.add_subparsers(dest="step", required=True)
+
+    links = steps.add_parser("links", help="write the page links of a thread to urls.txt")
+    links.add_argument("base_url")
+    links.add_argument("--pages", type=int, help="page count; read from the thread when left out")
+
+    steps.add_parser("content", help="scrape the URLs in urls.txt into JSON")
+
+    report = steps.add_parser("report", help="render the HTML report for a JSON/JSONL file")
+    report.add_argument("input")
+    report.add_argument("--per-page", type=int, default=500)
+
+    check = steps.add_parser("check", help="check the external links in a JSON/JSONL file and record which are dead")
+    check.add_argument("input")
+
+    run_all = steps.add_parser("all", help="links, content and report in one go")
+    run_all.add_argument("base_url", nargs="?", help="regenerate urls.txt from this thread first")
+    run_all.add_argument("--pages", type=int, help="page count; read from the thread when left out")
+    run_all.add_argument("--per-page", type=int, default=500)
+
+    batch = steps.add_parser("batch", help="scrape many threads at once, each into its own file")
+    batch.add_argument("threads", nargs="*")
+    batch.add_argument("--file", help="file with one thread URL per line, optionally followed by its page count")
+    batch.add_argument("--report", action="store_true", help="generate the HTML report for each thread")
+    batch.add_argument("--per-page", type=int, default=500)
+
+    watch = steps.add_parser("watch", help="re-check threads for new pages and scrape only what changed")
+    watch.add_argument("threads", nargs="+")
+    watch.add_argument("--interval", type=float, default=60, help="minutes between checks, 0 to check once")
+    watch.add_argument("--report", action="store_true", help="regenerate the HTML report after each scrape")
+    watch.add_argument("--per-page", type=int, default=500)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    reporter = Reporter(args.json_progress)
+
+    try:
+        if args.step == "links":
+            return write_links(args.base_url, args.pages, args.urls, reporter, args.config)
+        if args.step == "content":
+            return write_content(args.config, args.urls, reporter)
+        if args.step == "report":
+            return write_report(args.input, args.per_page, reporter)
+        if args.step == "check":
+            return check_output(args.config, args.input, reporter)
+        if args.step == "batch":
+            per_page = args.per_page if args.report else None
+            return run_batch(args.config, args.threads, args.file, per_page, reporter)
+        if args.step == "watch":
+            per_page = args.per_page if args.report else None
+            return watch_threads(args.config, args.threads, args.interval, per_page, reporter)
+
+        if args.base_url:
+            code = write_links(args.base_url, args.pages, args.urls, reporter, args.config)
+            if code != EXIT_OK:
+                return code
+        from generation_utils import run_generation
+        output = run_generation(args.config, args.urls, reporter.log, reporter.progress)
+        if output is None:
+            return EXIT_NO_URLS
+        reporter.emit("done", **content_done(output))
+        return write_report(output, args.per_page, reporter)
+    except KeyboardInterrupt:
+        if args.step == "watch":
+            # Ctrl+C is how a watch is normally stopped
+            return EXIT_OK
+        reporter.emit("error", step=args.step, message="interrupted")
+        return EXIT_ERROR
+    except Exception as e:
+        reporter.emit("error", step=args.step, message=str(e))
+        return EXIT_ERROR
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ import tkinter as tk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledFrame
+from tkinter import filedialog
+
+from url_utils import UrlList, split_urls
 
 def build_config_frame(parent, config_path):
     """
@@ -53,77 +56,170 @@ def build_config_frame(parent, config_path):
 def build_urls_frame(parent, urls_file):
     """
     Creates a Frame for changing the URL file inside the main window.
-    Always re-reads the file each time we refresh the list, ensuring the UI
-    is in sync with the current state of urls.txt.
+    Only the rows that fit on screen exist as widgets; scrolling swaps which
+    URLs they show, so the page stays fast with tens of thousands of links.
+    Edits go through a UrlList, which writes just the changed lines.
     """
     frame = tb.Frame(parent, bootstyle="dark")
 
     title_label = tb.Label(frame, text="Change URL File", font=("Helvetica", 18, "bold"))
     title_label.pack(pady=10)
 
-   
-    container = ScrolledFrame(frame, autohide=True, bootstyle="round")
-    container.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-    content = container  
+    url_list = UrlList(urls_file)
+    selected = set()
+    view = {"top": 0}
+    rows = []
+
+    count_label = tb.Label(frame, text="", anchor="w")
+    count_label.pack(fill="x", padx=15)
+
+    list_area = tb.Frame(frame, bootstyle="dark")
+    list_area.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    scrollbar = tb.Scrollbar(list_area, orient="vertical", bootstyle="round")
+    scrollbar.pack(side="right", fill="y")
+
+    rows_frame = tb.Frame(list_area, bootstyle="dark")
+    rows_frame.pack(side="left", fill="both", expand=True)
+    # Size comes from the window, not from however many rows are packed inside
+    rows_frame.pack_propagate(False)
+
+    def visible_count():
+        return len(rows)
+
+    def render():
+        total = len(url_list)
+        view["top"] = max(0, min(view["top"], total - visible_count()))
+        top = view["top"]
+        for offset, row in enumerate(rows):
+            index = top + offset
+            if index < total:
+                row["check"].config(text=url_list[index])
+                row["var"].set(index in selected)
+                if not row["frame"].winfo_manager():
+                    row["frame"].pack(fill="x", pady=1)
+            else:
+                row["frame"].pack_forget()
+        if total:
+            scrollbar.set(top / total, min(1.0, (top + visible_count()) / total))
+        else:
+            scrollbar.set(0, 1)
+        count_label.config(text=f"{total} URLs, {len(selected)} selected")
+
+    def scroll_to(top):
+        view["top"] = int(top)
+        render()
+
+    def on_scrollbar(action, amount, unit=None):
+        if action == "moveto":
+            scroll_to(float(amount) * len(url_list))
+        elif unit == "pages":
+            scroll_to(view["top"] + int(amount) * max(1, visible_count() - 1))
+        else:
+            scroll_to(view["top"] + int(amount))
+
+    def on_wheel(event):
+        if getattr(event, "num", None) == 4 or event.delta > 0:
+            scroll_to(view["top"] - 3)
+        else:
+            scroll_to(view["top"] + 3)
+
+    scrollbar.config(command=on_scrollbar)
+
+    def toggle(offset):
+        index = view["top"] + offset
+        if rows[offset]["var"].get():
+            selected.add(index)
+        else:
+            selected.discard(index)
+        render()
+
+    def make_row(offset):
+        row_frame = tb.Frame(rows_frame, bootstyle="dark")
+        var = tk.BooleanVar()
+        check = tb.Checkbutton(row_frame, text="", variable=var, command=lambda: toggle(offset))
+        check.pack(side="left", padx=5, fill="x", expand=True)
+        delete_btn = tb.Button(
+            row_frame,
+            text="Delete Link",
+            bootstyle="danger",
+            command=lambda: remove_urls([view["top"] + offset])
+        )
+        delete_btn.pack(side="right", padx=5)
+        for widget in (row_frame, check, delete_btn):
+            widget.bind("<MouseWheel>", on_wheel)
+            widget.bind("<Button-4>", on_wheel)
+            widget.bind("<Button-5>", on_wheel)
+        return {"frame": row_frame, "check": check, "var": var}
+
+    def on_resize(event):
+        # Keep just enough row widgets to fill the visible height
+        if not rows:
+            rows.append(make_row(0))
+            render()
+            rows_frame.update_idletasks()
+        row_height = max(1, rows[0]["frame"].winfo_reqheight() + 2)
+        wanted = max(1, event.height // row_height)
+        while len(rows) < wanted:
+            rows.append(make_row(len(rows)))
+        while len(rows) > wanted:
+            rows.pop()["frame"].destroy()
+        render()
+
+    rows_frame.bind("<Configure>", on_resize)
+    for widget in (rows_frame, list_area):
+        widget.bind("<MouseWheel>", on_wheel)
+        widget.bind("<Button-4>", on_wheel)
+        widget.bind("<Button-5>", on_wheel)
 
-    row_frames = []
+    def refresh_list():
+        """Re-reads urls.txt, e.g. after links were generated into it."""
+        url_list.load()
+        selected.clear()
+        render()
 
-    def get_urls_from_file():
-        """Read the current URLs from disk, stripping empty lines."""
-        try:
-            with open(urls_file, "r") as f:
-                return [line.strip() for line in f if line.strip()]
-        except FileNotFoundError:
-            return []
+    def remove_urls(indexes):
+        removed = url_list.delete(indexes)
+        selected.clear()
+        render()
+        if removed is None:
+            count_label.config(text="urls.txt was changed elsewhere and has been reloaded; nothing was deleted")
 
-    def refresh_list():
-        
-        
-        for rf in row_frames:
-            rf.destroy()
-        row_frames.clear()
-
-        loaded_urls = get_urls_from_file()
-
-        
-        for i, url in enumerate(loaded_urls):
-            row = tb.Frame(content, bootstyle="dark")
-            row.pack(fill="x", pady=3)
-            row_frames.append(row)
-
-            lbl = tb.Label(row, text=url, anchor="w")
-            lbl.pack(side="left", padx=5, fill="x", expand=True)
-
-            delete_btn = tb.Button(
-                row,
-                text="Delete Link",
-                bootstyle="danger",
-                command=lambda idx=i: remove_url(idx)
-            )
-            delete_btn.pack(side="right", padx=5)
-
-    def remove_url(index):
-        
-        loaded_urls = get_urls_from_file()
-        if 0 <= index < len(loaded_urls):
-            loaded_urls.pop(index)
-            with open(urls_file, "w") as f:
-                for u in loaded_urls:
-                    f.write(u + "\n")
-        refresh_list()
+    def remove_selected():
+        remove_urls(selected)
+
+    def select_all():
+        selected.update(range(len(url_list)))
+        render()
+
+    def clear_selection():
+        selected.clear()
+        render()
 
     def add_url():
-        
-        new_url = new_url_entry.get().strip()
-        if new_url:
-            loaded_urls = get_urls_from_file()
-            loaded_urls.append(new_url)
-            with open(urls_file, "w") as f:
-                for u in loaded_urls:
-                    f.write(u + "\n")
+        # Accepts a single URL or a pasted list separated by spaces/newlines
+        new_urls = split_urls(new_url_entry.get())
+        if new_urls:
+            url_list.add(new_urls)
             new_url_entry.delete(0, "end")
-        refresh_list()
-
+            scroll_to(len(url_list))
+
+    def import_urls():
+        path = filedialog.askopenfilename(
+            title="Import URLs",
+            filetypes=(("Text files", "*.txt"), ("All files", "*.*"))
+        )
+        if path:
+            added = url_list.import_file(path)
+            scroll_to(len(url_list))
+            count_label.config(text=f"Imported {added} new URLs, {len(url_list)} in total")
+
+    bulk_row = tb.Frame(frame, bootstyle="dark")
+    bulk_row.pack(fill="x", pady=(0, 5))
+    tb.Button(bulk_row, text="Select All", bootstyle="secondary", command=select_all).pack(side="left", padx=5)
+    tb.Button(bulk_row, text="Clear Selection", bootstyle="secondary", command=clear_selection).pack(side="left", padx=5)
+    tb.Button(bulk_row, text="Delete Selected", bootstyle="danger", command=remove_selected).pack(side="left", padx=5)
+    tb.Button(bulk_row, text="Import File", bootstyle="info outline", command=import_urls).pack(side="right", padx=5)
 
     add_row = tb.Frame(frame, bootstyle="dark")
     add_row.pack(fill="x", pady=(0, 10))
@@ -139,10 +235,8 @@ def build_urls_frame(parent, urls_file):
     add_button = tb.Button(add_row, text="Add", bootstyle="info", command=add_url)
     add_button.pack(side="right", padx=5)
 
-   
-    refresh_list()
+    render()
 
-    
     frame.refresh_list = refresh_list
 
     return frame
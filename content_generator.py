@@ -1,19 +1,18 @@
 # Standard library imports
 import os
-import json
 import threading
 import tkinter as tk
-import time
 
 # Third-party imports
 import ttkbootstrap as tb
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 
 # Local imports
-from login_utils import login_to_simpcity
-from scraper_utils import scrape_page
+from event_utils import EventQueue
+
+# How often the log and progress bar catch up with the workers, and how many
+# log lines the on-screen log keeps (the log file has everything)
+POLL_INTERVAL_MS = 100
+MAX_LOG_LINES = 2000
 
 def build_content_frame(parent, config_path, urls_file):
     """
@@ -35,12 +34,41 @@ def build_content_frame(parent, config_path, urls_file):
     log_text = tk.Text(frame, height=15, width=60, bg="#282828", fg="#1DB954", wrap="word")
     log_text.pack(pady=10, fill="both", expand=True)
 
-    generation_in_progress = [False]
+    # Where the last run spent its time, filled in when it finishes
+    summary_label = tb.Label(frame, text="", font=("Courier", 10), justify="left", anchor="w")
+    summary_label.pack(pady=5, fill="x")
 
-    def log_message(msg):
-        log_text.insert(tk.END, msg + "\n")
+    generation_in_progress = [False]
+    last_trace = [None]
+    log_path = os.path.join(os.path.dirname(config_path), "logs", "generation.log")
+    events = EventQueue(log_path)
+
+    def append_log(lines):
+        log_text.insert(tk.END, "\n".join(lines) + "\n")
+        # Drop the oldest lines once the on-screen log is full
+        line_count = int(log_text.index("end-1c").split(".")[0]) - 1
+        if line_count > MAX_LOG_LINES:
+            log_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
         log_text.see(tk.END)
 
+    def poll_events():
+        """Runs on the Tk loop, applying everything the workers queued since the last poll."""
+        lines, progress, finished = events.drain()
+        if lines:
+            append_log(lines)
+        if progress is not None:
+            done, total = progress
+            progress_bar.configure(value=(done / total) * 100)
+            progress_label.config(text=f"Scraped page {done}/{total}")
+        if finished:
+            generation_in_progress[0] = False
+            start_button.config(state="normal")
+            if last_trace[0] is not None:
+                from trace_utils import summarize_trace
+                summary_label.config(text=summarize_trace(last_trace[0]))
+        else:
+            frame.after(POLL_INTERVAL_MS, poll_events)
+
     def start_generation():
         """Triggered by the button. Spawns a background thread for the main generation."""
         if generation_in_progress[0]:
@@ -48,88 +76,30 @@ def build_content_frame(parent, config_path, urls_file):
 
         generation_in_progress[0] = True
         start_button.config(state="disabled")
-        log_message("Starting content generation...")
+        summary_label.config(text="")
+        events.log("Starting content generation...")
         threading.Thread(target=run_generation, daemon=True).start()
+        frame.after(POLL_INTERVAL_MS, poll_events)
 
     def run_generation():
         """
         The main scraping logic, running in a background thread
         to keep the GUI responsive.
         """
-        all_posts_data = []
         try:
-            with open(config_path, "r") as f:
-                config = json.load(f)
-            username = config.get("username", "")
-            password = config.get("password", "")
-            output_directory = config.get("output_directory", "")
-
-            with open(urls_file, "r") as file:
-                urls = [line.strip() for line in file if line.strip()]
-
-            if not urls:
-                log_message("No URLs found. Please add URLs first.")
-                return
-
-            folder_name = get_folder_name(urls[0])
-            if not os.path.exists(output_directory):
-                os.makedirs(output_directory)
-
-            edge_options = Options()
-            edge_options.add_argument("--disable-features=SmartScreen")
-            edge_options.add_argument("--disable-popup-blocking")
-            edge_options.add_argument("--log-level=3")
-            edge_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-
-            service = Service(log_path="NUL")
-            driver = webdriver.Edge(service=service, options=edge_options)
-
-            try:
-                driver.get("https://simpcity.cr/login/")
-                time.sleep(3)
-                login_to_simpcity(driver, username, password)
-                log_message("Logged in successfully.")
-
-                total_pages = len(urls)
-                for i, url in enumerate(urls):
-                    log_message(f"Scraping page {i+1}/{total_pages}: {url}")
-                    driver.get(url)
-                    time.sleep(5) # Wait for page to load
-
-                    page_data = scrape_page(driver)
-                    all_posts_data.extend(page_data)
-                    log_message(f"Found {len(page_data)} posts on page {i+1}.")
-
-                    # Update progress bar
-                    progress = ((i + 1) / total_pages) * 100
-                    frame.after(0, lambda val=progress: progress_bar.configure(value=val))
-                    frame.after(0, lambda: progress_label.config(text=f"Scraped page {i+1}/{total_pages}"))
-
-                # Save the final JSON file
-                output_filename = os.path.join(output_directory, f"{folder_name}.json")
-                with open(output_filename, "w", encoding="utf-8") as f:
-                    json.dump(all_posts_data, f, indent=2, ensure_ascii=False)
-
-                log_message(f"Successfully generated JSON file: {output_filename}")
-
-            finally:
-                driver.quit()
+            # The scraping modules load on the first run, not when the page opens
+            from generation_utils import run_generation as generate_content
+            from trace_utils import RunTrace
+            trace = RunTrace()
+            # Kept for the summary even when the run fails part way
+            last_trace[0] = trace
+            generate_content(config_path, urls_file, events.log, events.progress, trace=trace)
 
         except Exception as e:
-            log_message(f"An error occurred: {str(e)}")
+            events.log(f"An error occurred: {str(e)}")
 
         finally:
-            generation_in_progress[0] = False
-            frame.after(0, lambda: start_button.config(state="normal"))
-
-    def get_folder_name(url):
-        url = url.rstrip('/')
-        parts = url.split('/')
-        if 'threads' in parts:
-            idx = parts.index('threads')
-            if idx + 1 < len(parts):
-                return parts[idx + 1].split('.')[0] # Get name before any extension
-        return "default_content"
+            events.finish()
 
     start_button = tb.Button(frame, text="Start Generation", bootstyle="success outline", command=start_generation)
     start_button.pack(pady=10)
@@ -0,0 +1,189 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+LINK_FILTERS = ("all", "unique", "new")
+
+# Query parameters that only track where a click came from (plus any utm_*).
+# Generic names like ref or si are left alone: some hosts use them for content.
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid"}
+
+def normalize_url(url):
+    """
+    Canonical form used to recognise the same link posted differently:
+    lowercase scheme and host, default ports and tracking parameters
+    removed, no trailing slash. Paths, other parameters and fragments
+    (which hold keys on hosts like mega.nz) are kept as they are.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), parts.fragment))
+
+def _key(text):
+    """Signed 64-bit key, small enough for an SQLite INTEGER PRIMARY KEY."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+class LinkIndex:
+    """
+    Persistent index of every external link seen, across runs and threads.
+    Each normalized link maps to where it was first posted and how many
+    distinct posts it has been seen in, so re-scraping a thread doesn't
+    count its links again.
+
+    Links are stored under 64-bit keys (the INTEGER PRIMARY KEY), so
+    first-seen checks are primary key lookups, one query per batch of posts,
+    and nothing is loaded up front however large the index grows. Details
+    and counts are written in one transaction per batch.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            "key INTEGER PRIMARY KEY, url TEXT NOT NULL, first_thread TEXT NOT NULL, "
+            "first_post TEXT NOT NULL, first_seen REAL NOT NULL, count INTEGER NOT NULL)"
+        )
+        # One row per (link, post) it appeared in; owner is the key of "thread#post"
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sightings ("
+            "key INTEGER NOT NULL, owner INTEGER NOT NULL, PRIMARY KEY (key, owner)) WITHOUT ROWID"
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def seen(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM links WHERE key = ?", (_key(normalize_url(url)),)
+            ).fetchone() is not None
+
+    def _owners(self, keys):
+        """link key -> key of the (thread, post) it was first seen in, for the keys already stored."""
+        keys = list(keys)
+        owners = {}
+        for n in range(0, len(keys), 500):
+            chunk = keys[n:n + 500]
+            rows = self._conn.execute(
+                f"SELECT key, first_thread, first_post FROM links WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            owners.update((key, _key(f"{thread}#{post}")) for key, thread, post in rows)
+        return owners
+
+    def lookup(self, url):
+        """First-seen details and count for a link, or None if it was never seen."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, first_thread, first_post, first_seen, count FROM links WHERE key = ?",
+                (_key(normalize_url(url)),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("url", "first_thread", "first_post", "first_seen", "count"), row))
+
+    def record_posts(self, thread, posts):
+        """
+        Records the external links of a batch of posts. Returns, per post, a
+        list of (link, normalized, first_here) where first_here tells whether
+        the link was first seen in that very post, so re-running the same
+        thread gives the same answer.
+        """
+        now = time.time()
+        results = []
+        rows = {}
+        normalized_posts = [
+            [(link, normalize_url(link)) for link in post.get("external_links", [])] for post in posts
+        ]
+        with self._lock:
+            owners = self._owners({_key(normalized) for links in normalized_posts for _, normalized in links})
+            for post, links in zip(posts, normalized_posts):
+                post_number = str(post.get("post_number", ""))
+                owner = _key(f"{thread}#{post_number}")
+                entries = []
+                for link, normalized in links:
+                    key = _key(normalized)
+                    if key not in owners:
+                        owners[key] = owner
+                        rows[key] = [key, normalized, thread, post_number, now, 0]
+                    elif key not in rows:
+                        # Only the count changes for links seen before
+                        rows[key] = [key, normalized, "", "", now, 0]
+                    entries.append((link, normalized, owners[key] == owner))
+                results.append(entries)
+
+            with self._conn:
+                # A post only adds to a link's count the first time it is recorded
+                for post, entries in zip(posts, results):
+                    owner = _key(f"{thread}#{post.get('post_number', '')}")
+                    for key in {_key(normalized) for _, normalized, _ in entries}:
+                        cursor = self._conn.execute(
+                            "INSERT OR IGNORE INTO sightings (key, owner) VALUES (?, ?)", (key, owner)
+                        )
+                        rows[key][5] += cursor.rowcount
+                self._conn.executemany(
+                    "INSERT INTO links (key, url, first_thread, first_post, first_seen, count) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET count = count + excluded.count",
+                    rows.values(),
+                )
+        return results
+
+def filter_links(posts, link_filter="all", index=None, thread="", shown=None):
+    """
+    Trims each post's external_links in place, in page order. Every link is
+    also recorded in the index when one is given.
+
+    all     leave the links as scraped
+    unique  keep each link once per run: duplicates inside a post and links
+            already shown earlier (tracked in the `shown` set) are dropped
+    new     keep a link only in the post where the index first saw it, across
+            every thread and run; needs a LinkIndex
+    """
+    if link_filter not in LINK_FILTERS:
+        raise ValueError(f"Unknown link_filter '{link_filter}', expected one of {', '.join(LINK_FILTERS)}.")
+    if link_filter == "new" and index is None:
+        raise ValueError("link_filter 'new' needs a link index.")
+
+    if index is not None:
+        entries_per_post = index.record_posts(thread, posts)
+    else:
+        entries_per_post = [
+            [(link, normalize_url(link), True) for link in post.get("external_links", [])]
+            for post in posts
+        ]
+    if link_filter == "all":
+        return posts
+
+    shown = shown if shown is not None else set()
+    for post, entries in zip(posts, entries_per_post):
+        kept = []
+        for link, normalized, first_here in entries:
+            if normalized in shown or (link_filter == "new" and not first_here):
+                continue
+            shown.add(normalized)
+            kept.append(link)
+        post["external_links"] = kept
+    return posts
@@ -0,0 +1,204 @@
+import time
+import queue
+import threading
+from selenium import webdriver
+from selenium.webdriver.edge.service import Service
+from selenium.webdriver.edge.options import Options
+
+from login_utils import login_to_simpcity, save_session, apply_session
+from wait_utils import wait_for_login_form
+
+try:
+    import psutil
+except ImportError:  # memory figures are optional
+    psutil = None
+
+LOGIN_URL = "https://simpcity.cr/login/"
+
+BROWSER_PROFILES = ("lean", "default")
+
+# Requests the lean profile never lets through: the scraper reads image and
+# video URLs from the markup, so the files themselves are dead weight
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.png", "*.png?*", "*.gif", "*.gif?*",
+    "*.webp", "*.webp?*", "*.avif", "*.ico",
+    "*.mp4", "*.webm", "*.m4v", "*.mov", "*.mp3", "*.m3u8", "*.ts",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.*", "*scorecardresearch.com*",
+    "*exoclick.com*", "*exosrv.com*", "*juicyads.com*", "*trafficjunky.net*",
+    "*adsterra.com*", "*popads.net*", "*hotjar.com*", "*clarity.ms*",
+]
+
+def browser_settings(config):
+    """(browser profile, headless) from the config; pages load normally and in a window unless set."""
+    profile = config.get("browser_profile", "default")
+    headless = str(config.get("headless", False)).lower() in ("1", "true", "yes")
+    return profile, headless
+
+def create_driver(profile="default", headless=False, log_message=print):
+    """
+    Starts Edge. "default" loads pages as a normal browser would; the opt-in
+    "lean" profile doesn't load images, video, audio, web fonts or known
+    ad/analytics scripts, which the scraper never looks at. headless runs
+    Edge without a window.
+    """
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile {profile!r}, expected one of {BROWSER_PROFILES}")
+
+    edge_options = Options()
+    edge_options.add_argument("--disable-features=SmartScreen")
+    edge_options.add_argument("--disable-popup-blocking")
+    edge_options.add_argument("--log-level=3")
+    edge_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+
+    if profile == "lean":
+        edge_options.add_argument("--blink-settings=imagesEnabled=false")
+        edge_options.add_argument("--autoplay-policy=user-gesture-required")
+        edge_options.add_argument("--mute-audio")
+        edge_options.add_argument("--disable-remote-fonts")
+        edge_options.add_argument("--disable-extensions")
+        edge_options.add_argument("--disable-background-networking")
+        edge_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    if headless:
+        edge_options.add_argument("--headless=new")
+        edge_options.add_argument("--window-size=1366,900")
+
+    service = Service(log_path="NUL")
+    driver = webdriver.Edge(service=service, options=edge_options)
+
+    if profile == "lean":
+        # Blocked before the request is made, so nothing is downloaded at all
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            log_message(f"Could not block media and tracker requests, pages will load them: {e}")
+    return driver
+
+def login_driver(driver, username, password, timeout=15, timings=None, session_path=None, session=None):
+    """
+    Signs the driver in. A still-valid stored session is loaded straight into
+    the browser; otherwise the login form is used and, with session_path, the
+    new cookies are stored for the next run. Returns True once logged in.
+    """
+    if session is not None:
+        apply_session(driver, session)
+        return True
+
+    driver.get(LOGIN_URL)
+    wait_for_login_form(driver, timeout, timings)
+    logged_in = login_to_simpcity(driver, username, password, timeout, timings)
+    if logged_in and session_path:
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            user_agent = None
+        save_session(session_path, driver.get_cookies(), username, user_agent)
+    return logged_in
+
+def driver_memory_mb(driver):
+    """Resident memory of the driver and all its browser processes, or None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+def run_driver_pool(urls, num_workers, start_driver, scrape_url, on_page=None):
+    """
+    Scrapes the URLs with num_workers browsers pulling from a shared queue.
+
+    start_driver(worker_id) returns a ready (logged-in) driver,
+    scrape_url(driver, index, url) returns that page's posts and
+    on_page(index, url, page_data, memory_mb) is called from the worker thread
+    after each page, with the browser's memory as measured for the stats.
+
+    Returns (results, stats) where results holds each page's posts in the
+    original URL order. The first error stops the pool and is re-raised.
+    """
+    num_workers = max(1, min(num_workers, len(urls)))
+    work = queue.Queue()
+    for item in enumerate(urls):
+        work.put(item)
+
+    results = [None] * len(urls)
+    page_seconds = [0.0] * len(urls)
+    peak_mb = [None] * num_workers
+    errors = []
+    stop = threading.Event()
+
+    def worker(worker_id):
+        driver = None
+        try:
+            driver = start_driver(worker_id)
+            while not stop.is_set():
+                try:
+                    index, url = work.get_nowait()
+                except queue.Empty:
+                    break
+                start = time.perf_counter()
+                results[index] = scrape_url(driver, index, url)
+                page_seconds[index] = time.perf_counter() - start
+
+                memory = driver_memory_mb(driver)
+                if memory is not None:
+                    peak_mb[worker_id] = max(peak_mb[worker_id] or 0, memory)
+                if on_page:
+                    on_page(index, url, results[index], memory)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(num_workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    if errors:
+        raise errors[0]
+
+    measured = [mb for mb in peak_mb if mb is not None]
+    stats = {
+        "workers": num_workers,
+        "pages": len(urls),
+        "wall_seconds": round(wall, 2),
+        "page_seconds": round(sum(page_seconds), 2),
+        "pages_per_second": round(len(urls) / wall, 3) if wall else None,
+        # Sum of per-page time over wall time: how many pages were in flight on
+        # average. Not a measured comparison with a single browser
+        "parallelism": round(sum(page_seconds) / wall, 2) if wall else None,
+        "peak_mb_total": round(sum(measured), 1) if measured else None,
+        "peak_mb_per_worker": round(max(measured), 1) if measured else None,
+    }
+    return results, stats
+
+def summarize_pool(stats):
+    """One-line summary of a pool run for the log."""
+    line = (
+        f"{stats['workers']} browser worker(s): {stats['pages']} pages in {stats['wall_seconds']}s "
+        f"({stats['pages_per_second']} pages/s, {stats['parallelism']} pages in flight on average)"
+    )
+    if stats["peak_mb_total"] is not None:
+        line += f", peak memory {stats['peak_mb_total']} MB total / {stats['peak_mb_per_worker']} MB per worker"
+    else:
+        line += ", install psutil to report memory"
+    return line
@@ -0,0 +1,68 @@
+import os
+import queue
+import logging
+from logging.handlers import RotatingFileHandler
+
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+_file_loggers = {}
+
+def get_file_logger(log_path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Returns a logger writing to log_path, rotated at max_bytes with a few old copies kept."""
+    log_path = os.path.abspath(log_path)
+    logger = _file_loggers.get(log_path)
+    if logger is None:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        logger = logging.getLogger(f"simpdl.{len(_file_loggers)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+        logger.addHandler(handler)
+        _file_loggers[log_path] = logger
+    return logger
+
+class EventQueue:
+    """
+    Log lines and progress updates from background jobs. Workers push from
+    any thread without touching Tk; the UI takes everything pending in one
+    go with drain() on a timer. Log lines also go to the rotating log file
+    when one is given.
+    """
+
+    def __init__(self, log_path=None):
+        self._queue = queue.SimpleQueue()
+        self._file_log = get_file_logger(log_path) if log_path else None
+
+    def log(self, message):
+        self._queue.put(("log", message))
+        if self._file_log is not None:
+            self._file_log.info(message)
+
+    def progress(self, done, total):
+        self._queue.put(("progress", (done, total)))
+
+    def finish(self):
+        self._queue.put(("finished", None))
+
+    def drain(self, max_events=2000):
+        """
+        Returns (log lines, latest (done, total) or None, finished) for up to
+        max_events pending events. Only the newest progress update is kept.
+        """
+        lines = []
+        progress = None
+        finished = False
+        for _ in range(max_events):
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                lines.append(value)
+            elif kind == "progress":
+                progress = value
+            else:
+                finished = True
+        return lines, progress, finished
@@ -0,0 +1,79 @@
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# Markers of an interstitial or script-rendered page that plain HTTP can't get past
+_BROWSER_ONLY_MARKERS = ("cf-challenge", "challenge-platform", "Just a moment...", "enable JavaScript")
+
+def session_from_cookies(cookies, user_agent=None, pool_size=8):
+    """
+    Builds a pooled requests.Session carrying the given browser cookies
+    (as returned by driver.get_cookies()) and user agent.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+def session_from_driver(driver, pool_size=8):
+    """
+    Builds a pooled requests.Session that carries the logged-in browser's
+    cookies and user agent, so pages can be fetched without the browser.
+    """
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent;")
+    except Exception:
+        user_agent = None
+    return session_from_cookies(driver.get_cookies(), user_agent, pool_size)
+
+def needs_browser(html):
+    """True when a fetched page has no posts in its markup and must be rendered."""
+    if not html or "data-author" not in html:
+        return True
+    return any(marker in html for marker in _BROWSER_ONLY_MARKERS)
+
+def fetch_page(session, url, timeout=30, trace=None):
+    """
+    Returns the page HTML, or None if it has to go through the browser.
+    With a trace (trace_utils.RunTrace) the request is recorded as a fetch.
+    """
+    start = time.perf_counter()
+    status, size = None, 0
+    try:
+        response = session.get(url, timeout=timeout)
+        status, size = response.status_code, len(response.content)
+        if response.status_code != 200:
+            return None
+        html = response.text
+    except requests.RequestException:
+        return None
+    finally:
+        if trace is not None:
+            trace.record("fetch", time.perf_counter() - start, url, bytes=size, status=status)
+    if needs_browser(html):
+        return None
+    return html
+
+def fetch_pages(session, urls, max_workers=8, timeout=30, trace=None):
+    """
+    Fetches the URLs concurrently with a bounded pool of threads.
+    Yields (url, html) in the original order; html is None for pages
+    that need the browser fallback.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda u: fetch_page(session, u, timeout, trace), urls)
+        for url, html in zip(urls, results):
+            yield url, html
@@ -0,0 +1,296 @@
+"""
+Generated XenForo-style thread pages and a local stand-in forum to serve
+them, for benchmarks and offline runs of the scraper.
+"""
+import re
+import sys
+import random
+import secrets
+import threading
+import http.server
+from urllib.parse import parse_qs
+
+IMAGE_HOSTS = ("simp6.jpg6.su/images3", "simp7.jpg7.cr/images3", "simp2.jpg5.su/images3")
+IMAGE_PAGE_HOSTS = ("jpg6.su/img", "jpg7.cr/img")
+FILE_HOSTS = ("bunkr.cr/a", "gofile.io/d", "pixeldrain.com/u", "mega.nz/folder", "www.mediafire.com/file")
+WORDS = ("spring", "beach", "studio", "set", "preview", "gallery", "mirror", "outfit", "collection", "pack")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html id="XF" lang="en-US" dir="LTR" data-app="public" data-template="thread_view" data-logged-in="{logged_in}">
+<head>
+	<meta charset="utf-8" />
+	<title>{title} | Page {page} | SimpCity Forums</title>
+	<link rel="canonical" href="{thread_url}" />
+</head>
+<body data-template="thread_view">
+<div class="p-pageWrapper" id="top">
+<div class="p-body">
+{page_nav}
+<div class="block block--messages" data-type="post">
+<div class="block-container lbContainer">
+<div class="block-body js-replyNewMessageContainer">
+{posts}
+</div>
+</div>
+</div>
+{page_nav}
+</div>
+</div>
+</body>
+</html>
+"""
+
+POST_TEMPLATE = """
+	<article class="message message--post js-post js-inlineModContainer" data-author="{author}" data-content="post-{post_id}" id="js-post-{post_id}">
+		<div class="message-inner">
+			<div class="message-cell message-cell--user">
+				<section class="message-user">
+					<div class="message-avatar"><a href="/members/{author}.{author_id}/" class="avatar avatar--m"><img src="/data/avatars/m/0/{author_id}.jpg" alt="{author}" width="96" height="96" /></a></div>
+					<h4 class="message-name"><a href="/members/{author}.{author_id}/" class="username">{author}</a></h4>
+				</section>
+			</div>
+			<div class="message-cell message-cell--main">
+				<div class="message-main js-quickEditTarget">
+					<header class="message-attribution message-attribution--split">
+						<ul class="message-attribution-main listInline">
+							<li class="u-concealed"><a href="{base_path}/post-{post_id}" rel="nofollow"><time class="u-dt" datetime="{date}">{date}</time></a></li>
+						</ul>
+						<ul class="message-attribution-opposite message-attribution-opposite--list">
+							<li><a href="{base_path}/post-{post_id}" rel="nofollow">#{number}</a></li>
+						</ul>
+					</header>
+					<div class="message-content js-messageContent">
+						<div class="message-userContent lbContainer js-lbContainer">
+							<article class="message-body js-selectToQuote">
+								<div class="bbWrapper">{body}</div>
+							</article>
+						</div>
+					</div>
+				</div>
+			</div>
+		</div>
+	</article>
+"""
+
+SPOILER_TEMPLATE = """
+<div class="bbCodeBlock bbCodeBlock--hide bbCodeBlock--spoiler">
+	<button type="button" class="bbCodeSpoiler-button button--longText button" data-xf-click="toggle"><span class="button-text"><span>Spoiler: {label}</span></span></button>
+	<div class="bbCodeSpoiler-content"><div class="bbCodeBlock bbCodeBlock--spoiler"><div class="bbCodeBlock-content">{content}</div></div></div>
+</div>
+"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html id="XF" data-template="login" data-logged-in="false">
+<body>
+<form action="/login/login" method="post" class="block">
+	<input type="text" name="login" />
+	<input type="password" name="password" />
+	<button type="submit" class="button--primary button">Log in</button>
+</form>
+</body>
+</html>
+"""
+
+def _page_nav(base_path, page, pages):
+    if pages <= 1:
+        return ""
+    shown = sorted({1, 2, 3, page - 1, page, page + 1, pages} & set(range(1, pages + 1)))
+    items = []
+    for n in shown:
+        href = base_path + ("/" if n == 1 else f"/page-{n}")
+        current = " pageNav-page--current" if n == page else ""
+        items.append(f'<li class="pageNav-page{current}"><a href="{href}">{n}</a></li>')
+    return ('<div class="pageNavWrapper"><div class="pageNav"><ul class="pageNav-main">'
+            + "".join(items) + "</ul></div></div>")
+
+def _post_body(rng, number, images, spoilers, links):
+    word = rng.choice(WORDS)
+    parts = [f"{word.title()} {rng.choice(WORDS)} {number} - {rng.randint(10, 200)} photos<br />"]
+    for n in range(images):
+        host = rng.choice(IMAGE_HOSTS)
+        name = f"{word}_{number}_{n}"
+        if n % 2:
+            page_host = rng.choice(IMAGE_PAGE_HOSTS)
+            parts.append(f'<a href="https://{page_host}/{name}.{rng.getrandbits(24):x}" class="link link--external">'
+                         f'<img src="https://{host}/{name}.md.jpg" class="bbImage" alt="{name}.jpg" /></a>')
+        else:
+            parts.append(f'<img src="https://{host}/{name}.md.jpg" data-url="https://{host}/{name}.jpg" class="bbImage" alt="{name}.jpg" />')
+    link_html = []
+    for n in range(links):
+        host = rng.choice(FILE_HOSTS)
+        url = f"https://{host}/{rng.getrandbits(40):x}"
+        link_html.append(f'<a href="{url}" target="_blank" class="link link--external" rel="noopener">{url}</a><br />')
+    # Links go inside the spoilers when there are any, like most real posts
+    if spoilers:
+        per_spoiler = -(-len(link_html) // spoilers) if link_html else 0
+        for n in range(spoilers):
+            chunk = link_html[n * per_spoiler:(n + 1) * per_spoiler] if per_spoiler else []
+            parts.append(SPOILER_TEMPLATE.format(label="Download", content="".join(chunk) or "Password: forum"))
+    else:
+        parts.extend(link_html)
+    return "\n".join(parts)
+
+def make_thread_page(slug="bench-thread", thread_id=1, page=1, pages=1, posts_per_page=20,
+                     images_per_post=4, spoilers_per_post=1, links_per_post=3, seed=0,
+                     base_url="https://simpcity.cr", logged_in=True):
+    """
+    Returns the HTML of one page of a generated thread, laid out like
+    XenForo's thread_view: top and bottom page nav, one <article> per post
+    with its number, date, images, spoilers and file-host links. The same
+    arguments always give the same page. A logged-out page has no posts.
+    """
+    rng = random.Random(f"{seed}:{slug}:{page}")
+    base_path = f"/threads/{slug}.{thread_id}"
+    thread_url = base_url + base_path + ("/" if page == 1 else f"/page-{page}")
+    posts = []
+    if logged_in:
+        for i in range(posts_per_page):
+            number = (page - 1) * posts_per_page + i + 1
+            author_id = rng.randint(100, 9999)
+            posts.append(POST_TEMPLATE.format(
+                author=f"member_{author_id}",
+                author_id=author_id,
+                post_id=thread_id * 1000000 + number,
+                base_path=base_path,
+                date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                number=f"{number:,}",
+                body=_post_body(rng, number, images_per_post, spoilers_per_post, links_per_post),
+            ))
+    return PAGE_TEMPLATE.format(
+        logged_in="true" if logged_in else "false",
+        title=slug.replace("-", " ").title(),
+        page=page,
+        thread_url=thread_url,
+        page_nav=_page_nav(base_path, page, pages) if logged_in else "",
+        posts="".join(posts),
+    )
+
+class QuietHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded server that doesn't print a traceback when a client hangs up early."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+class XenForoServer:
+    """
+    Local stand-in for the forum. Serves generated thread pages at
+    /threads/<slug>.<id>/page-N (any slug and id, `pages` pages each), a
+    login form at /login/ that accepts `username`/`password` and sets a
+    session cookie, and /account/ for session checks. Without the cookie,
+    thread pages come back without posts, as they do for guests on the real
+    site. Pages past the end redirect to the last page.
+    """
+
+    def __init__(self, pages=50, posts_per_page=20, images_per_post=4, spoilers_per_post=1,
+                 links_per_post=3, username="bench", password="bench", delay=0.0, seed=0):
+        self.pages = pages
+        self.page_options = {
+            "posts_per_page": posts_per_page,
+            "images_per_post": images_per_post,
+            "spoilers_per_post": spoilers_per_post,
+            "links_per_post": links_per_post,
+            "seed": seed,
+        }
+        self.username = username
+        self.password = password
+        self.delay = delay
+        self.token = secrets.token_hex(8)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._cache = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def logged_in(self):
+                return f"xf_user={server.token}" in (self.headers.get("Cookie") or "")
+
+            def send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if body:
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if server.delay:
+                    threading.Event().wait(server.delay)
+                if path.startswith("/login"):
+                    self.send(200, LOGIN_PAGE.encode("utf-8"))
+                elif path.startswith("/account"):
+                    if self.logged_in():
+                        self.send(200, b'<html data-logged-in="true"><body class="p-navgroup--member"></body></html>')
+                    else:
+                        self.send(303, headers={"Location": "/login/"})
+                elif path.startswith("/threads/"):
+                    self.thread_page(path)
+                else:
+                    self.send(200, b"User-agent: *\n" if path == "/robots.txt" else b"<html></html>")
+
+            def thread_page(self, path):
+                match = re.match(r"/threads/([^/.]+)\.(\d+)(?:/page-(\d+))?/?$", path)
+                if not match:
+                    self.send(404, b"<html>Not found</html>")
+                    return
+                slug, thread_id, page = match.group(1), int(match.group(2)), int(match.group(3) or 1)
+                if page > server.pages:
+                    self.send(303, headers={"Location": f"/threads/{slug}.{thread_id}/page-{server.pages}"})
+                    return
+                self.send(200, server.page(slug, thread_id, page, self.logged_in()))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if (form.get("login", [""])[0] == server.username
+                        and form.get("password", [""])[0] == server.password):
+                    self.send(303, headers={
+                        "Location": "/",
+                        "Set-Cookie": f"xf_user={server.token}; Path=/; HttpOnly",
+                    })
+                else:
+                    self.send(200, LOGIN_PAGE.encode("utf-8"))
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def page(self, slug, thread_id, page, logged_in=True):
+        """The encoded HTML of one thread page, generated once and then reused."""
+        key = (slug, thread_id, page, logged_in)
+        html = self._cache.get(key)
+        if html is None:
+            html = make_thread_page(slug, thread_id, page, self.pages, base_url=self.url,
+                                    logged_in=logged_in, **self.page_options).encode("utf-8")
+            self._cache[key] = html
+        return html
+
+    def thread_url(self, slug="bench-thread", thread_id=1):
+        return f"{self.url}/threads/{slug}.{thread_id}"
+
+    def login(self, session):
+        """Logs a requests session in through the login form. Returns True on success."""
+        session.post(self.url + "/login/login", data={"login": self.username, "password": self.password},
+                     allow_redirects=False)
+        return "xf_user" in session.cookies
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
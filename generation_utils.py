@@ -0,0 +1,336 @@
+import os
+import json
+import threading
+
+from scraper_utils import extract_posts, expand_spoilers, scrape_page
+from login_utils import load_valid_session, SESSION_CHECK_URL
+from cache_utils import get_cache_dir, plan_pages, load_page, save_page
+from output_utils import OrderedJsonlWriter, compact_jsonl
+from storage_utils import PostStore
+from dedup_utils import LinkIndex, filter_links
+from classify_utils import load_classifier
+from trace_utils import RunTrace, CountingDriver, trace_path, summarize_trace
+
+def get_folder_name(url):
+    url = url.rstrip('/')
+    parts = url.split('/')
+    if 'threads' in parts:
+        idx = parts.index('threads')
+        if idx + 1 < len(parts):
+            return parts[idx + 1].split('.')[0] # Get name before any extension
+    return "default_content"
+
+def run_generation(config_path, urls_file, log_message=print, on_progress=None, overrides=None, fetcher=None,
+                   trace=None):
+    """
+    Scrapes every URL in urls_file with the settings in config_path and writes
+    the thread's JSON (or JSONL) file. Returns the output path, or None when
+    there are no URLs. Errors are raised to the caller.
+
+    log_message(msg) and on_progress(done, total) may be called from worker
+    threads. The browser, HTTP and image modules are only imported when the
+    run actually needs them, so the GUI and the command line can share this.
+    overrides replaces config.json values for this run only. A fetcher (see
+    throttle_utils.SharedFetcher) lets several runs share one pool of HTTP
+    workers; it implies the http fetch mode.
+
+    Every phase of the run is timed per page into trace (a fresh
+    trace_utils.RunTrace unless one is passed in), which is summarized in
+    the log and saved to traces/<name>.trace.json in the output directory.
+    """
+    wait_timings = []
+    trace = trace if trace is not None else RunTrace()
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    config.update(overrides or {})
+    username = config.get("username", "")
+    password = config.get("password", "")
+    output_directory = config.get("output_directory", "")
+    # "browser" renders every page in Edge, "http" fetches them with the
+    # browser's session cookies and only falls back to Edge when needed
+    fetch_mode = config.get("fetch_mode", "browser")
+    http_workers = int(config.get("http_workers", 8))
+    # Number of logged-in Edge instances scraping in parallel in browser mode
+    browser_workers = max(1, int(config.get("browser_workers", 1)))
+    # Upper bounds for the readiness waits, in seconds
+    page_timeout = float(config.get("page_timeout", 15))
+    login_timeout = float(config.get("login_timeout", 15))
+    # Members-only page used to check whether the saved session is still logged in
+    session_check_url = config.get("session_check_url", SESSION_CHECK_URL)
+    # Spoilers are read straight from the page source; only click them open
+    # when a forum loads their content on demand
+    click_spoilers = str(config.get("expand_spoilers", False)).lower() in ("1", "true", "yes")
+    # "full" re-scrapes everything, "resume" skips pages already checkpointed,
+    # "refresh" also re-scrapes the last page of the thread
+    scrape_mode = config.get("scrape_mode", "full")
+    # "json" writes one array at the end, "jsonl" appends posts as each page finishes
+    output_format = config.get("output_format", "json")
+    compact_output = str(config.get("compact_jsonl", False)).lower() in ("1", "true", "yes")
+    # Drop sample images smaller than this many pixels per side (0 keeps them all)
+    min_image_size = int(config.get("min_image_size", 0))
+    # Save small local copies of the sample images for the report (0 turns it off)
+    thumbnail_size = int(config.get("thumbnail_size", 0))
+    # Optional SQLite database that every scraped page is also stored in
+    sqlite_path = config.get("sqlite_path", "")
+    # "all" keeps every scraped link, "unique" shows each link once per run,
+    # "new" only where it was first posted across all threads and runs
+    link_filter = config.get("link_filter", "all")
+    link_index_path = config.get("link_index_path", "")
+    if fetcher is not None:
+        fetch_mode = "http"
+    # Check every external link in the output (HEAD / ranged GET) and record
+    # alive/dead per link; results are cached for link_check_ttl_hours
+    check_links_enabled = str(config.get("check_links", False)).lower() in ("1", "true", "yes")
+    link_check_ttl = float(config.get("link_check_ttl_hours", 24)) * 3600
+    link_check_workers = int(config.get("link_check_workers", 32))
+    link_check_per_host = int(config.get("link_check_per_host", 4))
+    # Save the per-phase timings of each run next to the output
+    write_trace = str(config.get("write_trace", True)).lower() in ("1", "true", "yes")
+
+    with open(urls_file, "r") as file:
+        urls = [line.strip() for line in file if line.strip()]
+
+    if not urls:
+        log_message("No URLs found. Please add URLs first.")
+        return None
+
+    # Image/file host rules, compiled once for the whole run
+    classifier = load_classifier(os.path.join(os.path.dirname(config_path), "link_rules.json"))
+
+    folder_name = get_folder_name(urls[0])
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+
+    total_pages = len(urls)
+    cache_dir = get_cache_dir(output_directory, folder_name)
+    to_scrape, cached_pages = plan_pages(cache_dir, urls, scrape_mode)
+    if cached_pages:
+        log_message(f"Found {len(cached_pages)} page(s) in the cache, {len(to_scrape)} left to scrape.")
+    trace.urls = urls
+    trace.info.update({
+        "thread": folder_name,
+        "fetch_mode": fetch_mode,
+        "browser_workers": browser_workers if fetch_mode != "http" else 0,
+        "pages_total": total_pages,
+        "pages_scraped": len(to_scrape),
+        "pages_cached": len(cached_pages),
+    })
+
+    if link_filter == "new" and not link_index_path:
+        link_index_path = os.path.join(output_directory, "link_index.db")
+    link_index = LinkIndex(link_index_path) if link_index_path else None
+    shown_links = set()
+
+    def emit_links(posts):
+        # Runs on each page's posts in page order, as they are written out
+        return filter_links(posts, link_filter, link_index, folder_name, shown_links)
+
+    writer = None
+    page_results = [None] * total_pages
+    if output_format == "jsonl":
+        output_filename = os.path.join(output_directory, f"{folder_name}.jsonl")
+        writer = OrderedJsonlWriter(output_filename, total_pages, transform=emit_links)
+        for i in cached_pages:
+            writer.add_page(i, load_page(cache_dir, urls[i]))
+    else:
+        output_filename = os.path.join(output_directory, f"{folder_name}.json")
+
+    if min_image_size or thumbnail_size:
+        from image_utils import filter_sample_images, load_size_cache, save_size_cache
+        from image_utils import add_thumbnails, load_thumbnail_index, save_thumbnail_index
+
+    size_cache_path = os.path.join(output_directory, ".image_sizes.json")
+    size_cache = load_size_cache(size_cache_path) if min_image_size else None
+    thumbnail_dir = os.path.join(output_directory, "thumbnails")
+    thumbnail_index = load_thumbnail_index(thumbnail_dir) if thumbnail_size else None
+
+    store = PostStore(sqlite_path) if sqlite_path else None
+
+    pages_done = [len(cached_pages)]
+    pages_done_lock = threading.Lock()
+
+    def page_finished(i, url, page_data, browser_mb=None):
+        # Called from whichever thread scraped the page
+        if min_image_size:
+            with trace.phase("images", url) as fields:
+                received = []
+                filter_sample_images(page_data, min_image_size, size_cache, received=received)
+                fields.update(bytes=sum(received), requests=len(received))
+        if thumbnail_size:
+            with trace.phase("thumbnails", url) as fields:
+                received = []
+                add_thumbnails(page_data, thumbnail_dir, thumbnail_index, thumbnail_size, received=received)
+                fields.update(bytes=sum(received), requests=len(received))
+        with trace.phase("cache", url):
+            save_page(cache_dir, url, page_data, last_page=(i == total_pages - 1))
+        if store is not None:
+            with trace.phase("sqlite", url):
+                store.store_posts(folder_name, page_data)
+        if writer is not None:
+            with trace.phase("write", url):
+                writer.add_page(i, page_data)
+        else:
+            page_results[i] = page_data
+        trace.sample_memory(url, browser_mb)
+        with pages_done_lock:
+            pages_done[0] += 1
+            done = pages_done[0]
+        log_message(f"Found {len(page_data)} posts on page {i+1}.")
+
+        if on_progress:
+            on_progress(done, total_pages)
+
+    # Cookies from an earlier run are reused while they are still valid
+    session_path = os.path.join(os.path.dirname(config_path), "session.json")
+    if not to_scrape or fetcher is not None:
+        # A batch's pages go through the batch's own session; the saved one is
+        # only checked if a page falls back to the browser (see start_driver)
+        stored_session = None
+    else:
+        stored_session = load_valid_session(session_path, username, session_check_url)
+    if stored_session is not None:
+        log_message("Reusing the saved login session.")
+
+    def check_output_links(path):
+        from linkcheck_utils import check_file
+        log_message("Checking external links...")
+        with trace.phase("link_check") as fields:
+            counts = check_file(path, os.path.join(output_directory, ".link_status.json"), link_check_ttl,
+                                link_check_workers, link_check_per_host, log_message=log_message)
+            fields["checked"] = counts["checked"]
+        log_message(
+            f"Links: {counts['alive']} alive, {counts['dead']} dead, {counts['unknown']} unknown "
+            f"({counts['checked']} checked, the rest cached)"
+        )
+
+    def start_driver(worker_id):
+        from driver_utils import create_driver, login_driver, browser_settings
+        driver_session = stored_session
+        if fetcher is not None:
+            driver_session = load_valid_session(session_path, username, session_check_url)
+        with trace.phase("login", worker=worker_id):
+            # Calls on the driver are counted against the page it is on
+            driver = CountingDriver(create_driver(*browser_settings(config), log_message), trace)
+            logged_in = login_driver(driver, username, password, login_timeout, wait_timings, session_path,
+                                     driver_session)
+        if logged_in:
+            log_message("Logged in successfully." if worker_id == 0 else f"Worker {worker_id+1} logged in.")
+        else:
+            log_message("Login was not confirmed, continuing anyway.")
+        return driver
+
+    def scrape_url(driver, i, url):
+        from wait_utils import wait_for_posts
+        log_message(f"Scraping page {i+1}/{total_pages}: {url}")
+        driver.page = url
+        with trace.phase("navigation", url):
+            driver.get(url)
+        with trace.phase("wait", url):
+            posts_appeared = wait_for_posts(driver, page_timeout, wait_timings)
+        if not posts_appeared:
+            log_message(f"No posts appeared on page {i+1} within {page_timeout:g}s.")
+        if click_spoilers:
+            with trace.phase("spoilers", url):
+                expanded = expand_spoilers(driver, timings=wait_timings)
+            log_message(f"Expanded {expanded} spoiler(s) on page {i+1}.")
+        with trace.phase("extraction", url) as fields:
+            # Bytes are the page source's; the browser's own downloads can't be seen from here
+            return scrape_page(driver, classifier=classifier, fields=fields)
+
+    try:
+        scrape_urls = [urls[i] for i in to_scrape]
+        if not scrape_urls:
+            log_message("Every page is already cached.")
+        elif fetch_mode == "http":
+            from fetch_utils import session_from_driver, session_from_cookies, fetch_pages
+            driver = None
+            try:
+                if fetcher is not None:
+                    fetched = fetcher.fetch_pages(scrape_urls, trace)
+                else:
+                    if stored_session is not None:
+                        session = session_from_cookies(stored_session["cookies"], stored_session.get("user_agent"), http_workers)
+                    else:
+                        driver = start_driver(0)
+                        session = session_from_driver(driver, http_workers)
+                    fetched = fetch_pages(session, scrape_urls, max_workers=http_workers, trace=trace)
+                for j, (url, html) in enumerate(fetched):
+                    i = to_scrape[j]
+                    if html is not None:
+                        log_message(f"Fetched page {i+1}/{total_pages}: {url}")
+                        with trace.phase("extraction", url) as fields:
+                            page_data = extract_posts(html, url, classifier)
+                            fields["posts"] = len(page_data)
+                    else:
+                        log_message(f"Page {i+1} needs the browser, falling back: {url}")
+                        if driver is None:
+                            driver = start_driver(0)
+                        page_data = scrape_url(driver, i, url)
+                    page_finished(i, url, page_data)
+            finally:
+                if driver is not None:
+                    driver.quit()
+        else:
+            from driver_utils import run_driver_pool, summarize_pool
+            if browser_workers > 1:
+                log_message(f"Starting {browser_workers} browser workers...")
+            _, pool_stats = run_driver_pool(
+                scrape_urls,
+                browser_workers,
+                start_driver,
+                lambda driver, j, url: scrape_url(driver, to_scrape[j], url),
+                on_page=lambda j, url, page_data, browser_mb: page_finished(to_scrape[j], url, page_data, browser_mb),
+            )
+            log_message(summarize_pool(pool_stats))
+
+        if writer is not None:
+            with trace.phase("write"):
+                writer.close()
+            log_message(f"Streamed {writer.posts_written} posts to {output_filename}")
+            if check_links_enabled:
+                check_output_links(output_filename)
+            if compact_output:
+                json_filename = os.path.join(output_directory, f"{folder_name}.json")
+                with trace.phase("write"):
+                    compact_jsonl(output_filename, json_filename)
+                log_message(f"Compacted into JSON file: {json_filename}")
+        else:
+            # Pages are merged in URL order regardless of which worker finished first
+            all_posts_data = []
+            for i, page_data in enumerate(page_results):
+                if page_data is None:
+                    page_data = load_page(cache_dir, urls[i])
+                all_posts_data.extend(emit_links(page_data))
+
+            # Save the final JSON file
+            with trace.phase("write", posts=len(all_posts_data)):
+                with open(output_filename, "w", encoding="utf-8") as f:
+                    json.dump(all_posts_data, f, indent=2, ensure_ascii=False)
+
+            log_message(f"Successfully generated JSON file: {output_filename}")
+            if check_links_enabled:
+                check_output_links(output_filename)
+    finally:
+        if writer is not None:
+            writer.close()
+        if size_cache is not None:
+            save_size_cache(size_cache_path, size_cache)
+        if thumbnail_index is not None:
+            save_thumbnail_index(thumbnail_dir, thumbnail_index)
+        if store is not None:
+            store.close()
+        if link_index is not None:
+            link_index.close()
+        # Saved for failed runs too, to see how far they got and where the time went
+        trace.finish()
+        if write_trace:
+            trace.save(trace_path(output_filename))
+
+    if wait_timings:
+        from wait_utils import summarize_waits
+        log_message(summarize_waits(wait_timings))
+    log_message(summarize_trace(trace))
+    if write_trace:
+        log_message(f"Trace saved to {trace_path(output_filename)}")
+    return output_filename
+
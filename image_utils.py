@@ -1,6 +1,19 @@
+import os
+import json
+import hashlib
+import threading
 import requests
-from PIL import Image
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from PIL import Image, ImageFile, features
+
+# Byte ranges tried in turn when reading an image's header. Most JPEG/WebP
+# headers fit in the first one; large EXIF blocks can push the size further.
+PROBE_RANGES = (16 * 1024, 256 * 1024)
+
+_session = None
+_session_lock = threading.Lock()
 
 def get_image_src(driver, image_element):
     try:
@@ -8,15 +21,209 @@ def get_image_src(driver, image_element):
     except Exception:
         return driver.execute_script("return arguments[0].getAttribute('src');", image_element)
 
+def get_session(pool_size=16):
+    """Shared, pooled session so image requests reuse their connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def probe_image_size(image_url, session=None, timeout=15, received=None):
+    """
+    Returns (width, height) by reading only the start of the image: a Range
+    request, fed chunk by chunk into Pillow's incremental parser until the
+    header is known. Returns None if the size can't be read.
+    The bytes read by each request are appended to the `received` list if given.
+    """
+    if image_url.startswith("data:") or not image_url.startswith("http"):
+        return None
+    session = session or get_session()
+    parser = ImageFile.Parser()
+    offset = 0
+    for limit in PROBE_RANGES:
+        headers = {"Range": f"bytes={offset}-{limit - 1}"}
+        start = offset
+        try:
+            with session.get(image_url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code not in (200, 206):
+                    return None
+                if response.status_code == 200:
+                    # Range ignored: the body starts at byte 0 again
+                    parser = ImageFile.Parser()
+                    offset = start = 0
+                for chunk in response.iter_content(4096):
+                    parser.feed(chunk)
+                    offset += len(chunk)
+                    if parser.image is not None:
+                        return parser.image.size
+                    if offset >= PROBE_RANGES[-1]:
+                        return None
+                if response.status_code == 200:
+                    # Whole body read without finding a header
+                    return None
+        finally:
+            if received is not None:
+                received.append(offset - start)
+    return None
+
+def load_size_cache(cache_path):
+    """URL -> [width, height] verdicts from earlier runs."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_size_cache(cache_path, cache):
+    tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+def probe_images(image_urls, cache=None, max_workers=8, received=None):
+    """
+    Probes many images at once and returns url -> (width, height) or None.
+    Sizes already in `cache` are not fetched again; new ones are added to it.
+    Failed probes are not cached so they get another try next run.
+    """
+    cache = cache if cache is not None else {}
+    sizes = {}
+    missing = []
+    for url in dict.fromkeys(image_urls):
+        if url in cache:
+            sizes[url] = tuple(cache[url])
+        else:
+            missing.append(url)
+
+    def probe(url):
+        try:
+            return probe_image_size(url, received=received)
+        except Exception as e:
+            print(f"Error probing image {url}: {e}")
+            return None
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, size in zip(missing, executor.map(probe, missing)):
+                sizes[url] = size
+                if size is not None:
+                    cache[url] = list(size)
+    return sizes
+
+def is_large_enough(size, min_size=256):
+    return size is not None and size[0] >= min_size and size[1] >= min_size
+
+def filter_sample_images(posts, min_size=256, cache=None, max_workers=8, received=None):
+    """
+    Drops sample images smaller than min_size x min_size from each post, in
+    place. The bytes of each probe request go into the `received` list if given.
+    """
+    urls = [url for post in posts for url in post["sample_images"]]
+    if not urls:
+        return posts
+    sizes = probe_images(urls, cache, max_workers, received)
+    for post in posts:
+        post["sample_images"] = [url for url in post["sample_images"] if is_large_enough(sizes.get(url), min_size)]
+    return posts
+
 def is_valid_image(image_url):
     try:
-        if image_url.startswith("data:") or not image_url.startswith("http"):
-            return False
-        response = requests.get(image_url, stream=True)
-        if response.status_code == 200:
-            image = Image.open(BytesIO(response.content))
-            width, height = image.size
-            return width >= 256 and height >= 256
+        return is_large_enough(probe_image_size(image_url))
     except Exception as e:
         print(f"Error validating image {image_url}: {e}")
     return False
+
+def make_thumbnail(data, max_size=300):
+    """
+    Shrinks image bytes to fit in max_size x max_size. Returns (bytes, extension),
+    WebP when Pillow supports it and JPEG otherwise.
+    """
+    image = Image.open(BytesIO(data))
+    # Lets the JPEG decoder skip straight to a reduced scale
+    image.draft("RGB", (max_size, max_size))
+    image.thumbnail((max_size, max_size))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    out = BytesIO()
+    if features.check("webp"):
+        image.save(out, "WEBP", quality=75, method=4)
+        return out.getvalue(), "webp"
+    image.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+    return out.getvalue(), "jpg"
+
+def load_thumbnail_index(thumbnail_dir):
+    """URL -> thumbnail file name for every image already in the cache."""
+    try:
+        with open(os.path.join(thumbnail_dir, "index.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_thumbnail_index(thumbnail_dir, index):
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    save_size_cache(os.path.join(thumbnail_dir, "index.json"), index)
+
+def fetch_thumbnail(image_url, thumbnail_dir, max_size=300, session=None, timeout=30, received=None):
+    """
+    Downloads one image and stores its thumbnail under the SHA-256 of the
+    image bytes, so the same picture posted under different URLs is kept once.
+    Returns the thumbnail's file name, or None on failure.
+    """
+    session = session or get_session()
+    response = session.get(image_url, timeout=timeout)
+    if received is not None:
+        received.append(len(response.content))
+    if response.status_code != 200:
+        return None
+    digest = hashlib.sha256(response.content).hexdigest()
+    for ext in ("webp", "jpg"):
+        if os.path.exists(os.path.join(thumbnail_dir, f"{digest}.{ext}")):
+            return f"{digest}.{ext}"
+
+    data, ext = make_thumbnail(response.content, max_size)
+    name = f"{digest}.{ext}"
+    path = os.path.join(thumbnail_dir, name)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return name
+
+def add_thumbnails(posts, thumbnail_dir, index, max_size=300, max_workers=8, received=None):
+    """
+    Gives each post a "thumbnails" list matching its sample_images, holding the
+    path of the local thumbnail relative to the output folder (None if it
+    couldn't be made). Images already in `index` are never downloaded again.
+    The size of each download goes into the `received` list if given.
+    """
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    folder = os.path.basename(os.path.normpath(thumbnail_dir))
+
+    def fetch(url):
+        try:
+            return fetch_thumbnail(url, thumbnail_dir, max_size, received=received)
+        except Exception as e:
+            print(f"Error making thumbnail for {url}: {e}")
+            return None
+
+    missing = [
+        url for url in dict.fromkeys(u for post in posts for u in post["sample_images"])
+        if not (url in index and os.path.exists(os.path.join(thumbnail_dir, index[url])))
+    ]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, name in zip(missing, executor.map(fetch, missing)):
+                if name is not None:
+                    index[url] = name
+
+    for post in posts:
+        post["thumbnails"] = [
+            f"{folder}/{index[url]}" if url in index else None
+            for url in post["sample_images"]
+        ]
+    return posts
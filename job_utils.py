@@ -0,0 +1,140 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from link_utils import generate_links, discover_links, load_watch_state, save_watch_state, thread_url
+from login_utils import load_valid_session, SESSION_CHECK_URL
+from generation_utils import run_generation, get_folder_name
+
+def read_thread_list(path):
+    """
+    Reads a batch file: one thread URL per line, optionally followed by its
+    page count. Blank lines and lines starting with # are skipped.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            pages = int(parts[1]) if len(parts) > 1 else None
+            entries.append((parts[0], pages))
+    return entries
+
+def batch_session(config_path, config, log_message):
+    """
+    Returns a requests session that is logged in, from the saved session when
+    it still works, otherwise by logging in once with the browser.
+    """
+    from fetch_utils import session_from_cookies, session_from_driver
+
+    pool_size = int(config.get("http_workers", 8))
+    session_path = os.path.join(os.path.dirname(config_path), "session.json")
+    check_url = config.get("session_check_url", SESSION_CHECK_URL)
+    stored = load_valid_session(session_path, config.get("username", ""), check_url)
+    if stored is not None:
+        log_message("Reusing the saved login session.")
+        return session_from_cookies(stored["cookies"], stored.get("user_agent"), pool_size)
+
+    from driver_utils import create_driver, login_driver, browser_settings
+    driver = create_driver(*browser_settings(config), log_message)
+    try:
+        login_driver(driver, config.get("username", ""), config.get("password", ""),
+                     float(config.get("login_timeout", 15)), session_path=session_path)
+        return session_from_driver(driver, pool_size)
+    finally:
+        driver.quit()
+
+def run_jobs(config_path, threads, log_message=print, on_progress=None):
+    """
+    Scrapes many threads in one go, each into its own output file.
+
+    threads is a list of (thread url, page count or None); missing page
+    counts are read from the thread. job_workers threads run at a time,
+    and all of their pages go through one shared pool of HTTP workers whose
+    per-host concurrency adapts to how the forum responds.
+
+    Returns one {"thread", "output", "error"} dict per thread, in order.
+    """
+    from throttle_utils import SharedFetcher
+
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    # Threads set up and written out at the same time
+    job_workers = max(1, int(config.get("job_workers", 4)))
+    # Starting and upper concurrency per host; the limiter moves between 1 and the maximum
+    host_initial = max(1, int(config.get("host_initial_concurrency", 2)))
+    host_max = max(host_initial, int(config.get("host_max_concurrency", 8)))
+    page_timeout = float(config.get("page_timeout", 15))
+    if config.get("link_filter", "all") == "new" and job_workers > 1:
+        # Each run loads the link index when it starts, so threads running side
+        # by side can't see each other's links; their pages still share the fetch pool
+        log_message('link_filter is "new": scraping one thread at a time.')
+        job_workers = 1
+
+    session = batch_session(config_path, config, log_message)
+    fetcher = SharedFetcher(session, max_workers=host_max * 2, initial=host_initial,
+                            max_per_host=host_max, timeout=max(page_timeout, 30))
+
+    state_path = os.path.join(os.path.dirname(config_path), "watch_state.json")
+    state = load_watch_state(state_path)
+    jobs_dir = os.path.join(os.path.dirname(config_path), "jobs")
+    os.makedirs(jobs_dir, exist_ok=True)
+
+    results = []
+    jobs = []
+    for url, pages in threads:
+        base_link = thread_url(url)
+        result = {"thread": base_link, "output": None, "error": None}
+        results.append(result)
+        if pages:
+            links = generate_links(base_link, pages)
+        else:
+            links = discover_links(session, base_link, state)
+            if links is None:
+                result["error"] = "could not read the page count"
+                log_message(f"Skipping {base_link}: could not read the page count.")
+                continue
+        # Each thread gets its own URL list so urls.txt is left alone
+        urls_file = os.path.join(jobs_dir, get_folder_name(base_link) + ".txt")
+        with open(urls_file, "w") as f:
+            f.write("\n".join(links) + "\n")
+        jobs.append((result, urls_file, len(links)))
+    save_watch_state(state_path, state)
+
+    done_by_job = [0] * len(jobs)
+    total_pages = sum(n for _, _, n in jobs)
+    progress_lock = threading.Lock()
+
+    def run_job(job_index):
+        result, urls_file, _ = jobs[job_index]
+        name = get_folder_name(result["thread"])
+
+        def job_progress(done, total):
+            with progress_lock:
+                done_by_job[job_index] = done
+                done_all = sum(done_by_job)
+            if on_progress:
+                on_progress(done_all, total_pages)
+
+        try:
+            result["output"] = run_generation(config_path, urls_file, lambda msg: log_message(f"[{name}] {msg}"),
+                                              job_progress, fetcher=fetcher)
+        except Exception as e:
+            result["error"] = str(e)
+            log_message(f"[{name}] An error occurred: {e}")
+
+    log_message(f"Scraping {len(jobs)} thread(s), {total_pages} pages, {job_workers} at a time.")
+    try:
+        with ThreadPoolExecutor(max_workers=job_workers) as executor:
+            list(executor.map(run_job, range(len(jobs))))
+    finally:
+        fetcher.close()
+
+    for host, stats in fetcher.limiters.stats().items():
+        log_message(
+            f"{host}: concurrency ended at {stats['limit']} (peak {stats['peak_limit']}), "
+            f"throttled {stats['throttled']} time(s)"
+        )
+    return results
@@ -0,0 +1,112 @@
+import os
+import queue
+import threading
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+import tkinter as tk
+
+from link_utils import generate_links
+
+POLL_INTERVAL_MS = 100
+
+def build_generate_links_frame(parent, urls_file, refresh_urls_func=None):
+    frame = tb.Frame(parent, bootstyle="dark")
+
+    title_label = tb.Label(frame, text="Generate Links", font=("Helvetica", 18, "bold"))
+    title_label.pack(pady=10)
+
+    row1 = tb.Frame(frame, bootstyle="dark")
+    row1.pack(pady=5)
+    tb.Label(row1, text="Base Link: ").pack(side="left")
+    base_link_entry = tb.Entry(row1, width=40)
+    base_link_entry.pack(side="left", padx=5)
+
+    row2 = tb.Frame(frame, bootstyle="dark")
+    row2.pack(pady=5)
+    tb.Label(row2, text="Number of Pages: ").pack(side="left")
+    pages_entry = tb.Entry(row2, width=10)
+    pages_entry.pack(side="left", padx=5)
+
+    status_label = tb.Label(frame, text="", font=("Helvetica", 11))
+    status_label.pack(pady=5)
+
+    config_dir = os.path.dirname(urls_file)
+    # Detect results from the worker thread; only the Tk thread polls it
+    detected = queue.SimpleQueue()
+
+    def detect_pages():
+        """Reads the page count from the thread's page nav in the background."""
+        base_link = base_link_entry.get().strip()
+        if not base_link:
+            status_label.config(text="Error: enter the thread link first.")
+            return
+        detect_btn.config(state="disabled")
+        status_label.config(text="Checking the thread...")
+
+        def work():
+            from link_utils import discover_links, discovery_session, load_watch_state, save_watch_state, thread_url
+            state_path = os.path.join(config_dir, "watch_state.json")
+            try:
+                state = load_watch_state(state_path)
+                links = discover_links(discovery_session(os.path.join(config_dir, "config.json")), base_link, state)
+                if links is not None:
+                    save_watch_state(state_path, state)
+            except Exception as e:
+                links = e
+            detected.put((thread_url(base_link), links))
+
+        threading.Thread(target=work, daemon=True).start()
+        frame.after(POLL_INTERVAL_MS, poll_detected)
+
+    def poll_detected():
+        try:
+            base_link, links = detected.get_nowait()
+        except queue.Empty:
+            frame.after(POLL_INTERVAL_MS, poll_detected)
+            return
+        show_detected(base_link, links)
+
+    def show_detected(base_link, links):
+        detect_btn.config(state="normal")
+        if isinstance(links, Exception):
+            status_label.config(text=f"Error: {links}")
+        elif links is None:
+            status_label.config(text="Error: could not read the page count, enter it by hand.")
+        else:
+            base_link_entry.delete(0, "end")
+            base_link_entry.insert(0, base_link)
+            pages_entry.delete(0, "end")
+            pages_entry.insert(0, str(len(links)))
+            status_label.config(text=f"The thread has {len(links)} page(s).")
+
+    detect_btn = tb.Button(row2, text="Detect", bootstyle="info outline", command=detect_pages)
+    detect_btn.pack(side="left", padx=5)
+
+    def generate():
+        base_link = base_link_entry.get().strip()
+        try:
+            num_pages = int(pages_entry.get())
+            if num_pages < 1:
+                raise ValueError("At least 1 page required.")
+
+            
+            links = generate_links(base_link, num_pages)
+
+            
+            with open(urls_file, "w") as f:
+                for link in links:
+                    f.write(link + "\n")
+
+            status_label.config(text="Generated links saved to URLs file.")
+
+            
+            if refresh_urls_func:
+                refresh_urls_func()
+
+        except ValueError as e:
+            status_label.config(text=f"Error: {e}")
+
+    generate_btn = tb.Button(frame, text="Generate", bootstyle="success outline", command=generate)
+    generate_btn.pack(pady=10)
+
+    return frame
@@ -1,6 +1,12 @@
-import ttkbootstrap as tb
-from ttkbootstrap.constants import *
-import tkinter as tk
+import os
+import re
+import json
+import time
+import requests
+
+_PAGE_SUFFIX_RE = re.compile(r"/page-\d+/?$")
+_NAV_START = "pageNav-main"
+_NAV_PAGE_RE = re.compile(r"<a[^>]*>\s*(\d+)\s*</a>")
 
 def generate_links(base_link, num_pages):
     links = [base_link.rstrip("/")]
@@ -9,52 +15,94 @@ def generate_links(base_link, num_pages):
         links.append(new_link)
     return links
 
-def build_generate_links_frame(parent, urls_file, refresh_urls_func=None):
-    frame = tb.Frame(parent, bootstyle="dark")
-
-    title_label = tb.Label(frame, text="Generate Links", font=("Helvetica", 18, "bold"))
-    title_label.pack(pady=10)
-
-    row1 = tb.Frame(frame, bootstyle="dark")
-    row1.pack(pady=5)
-    tb.Label(row1, text="Base Link: ").pack(side="left")
-    base_link_entry = tb.Entry(row1, width=40)
-    base_link_entry.pack(side="left", padx=5)
-
-    row2 = tb.Frame(frame, bootstyle="dark")
-    row2.pack(pady=5)
-    tb.Label(row2, text="Number of Pages: ").pack(side="left")
-    pages_entry = tb.Entry(row2, width=10)
-    pages_entry.pack(side="left", padx=5)
+def thread_url(url):
+    """Strips the fragment, query and /page-N from a thread URL."""
+    url = url.split("#", 1)[0].split("?", 1)[0].rstrip("/")
+    return _PAGE_SUFFIX_RE.sub("", url)
 
-    status_label = tb.Label(frame, text="", font=("Helvetica", 11))
-    status_label.pack(pady=5)
+def page_url(base_link, page):
+    return base_link.rstrip("/") if page <= 1 else f"{base_link.rstrip('/')}/page-{page}"
 
-    def generate():
-        base_link = base_link_entry.get().strip()
-        try:
-            num_pages = int(pages_entry.get())
-            if num_pages < 2:
-                raise ValueError("At least 2 pages required.")
+def parse_last_page(html):
+    """
+    Returns the highest page number in the thread's pagination controls,
+    or None when the HTML has no (complete) page nav.
+    """
+    start = html.find(_NAV_START)
+    if start == -1:
+        return None
+    end = html.find("</ul>", start)
+    if end == -1:
+        return None
+    pages = [int(n) for n in _NAV_PAGE_RE.findall(html, start, end)]
+    return max(pages) if pages else None
 
-            
-            links = generate_links(base_link, num_pages)
+def discover_last_page(session, url, timeout=30, chunk_size=16384):
+    """
+    Finds how many pages a thread has with one request. XenForo draws the
+    page nav above the posts, so the body is only read until the nav closes.
+    A thread page without a nav has a single page. Returns None when the
+    page can't be read over plain HTTP (login wall, challenge, error).
+    """
+    from fetch_utils import needs_browser
 
-            
-            with open(urls_file, "w") as f:
-                for link in links:
-                    f.write(link + "\n")
+    try:
+        with session.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            html = ""
+            for chunk in response.iter_content(chunk_size, decode_unicode=True):
+                html += chunk if isinstance(chunk, str) else chunk.decode("utf-8", "replace")
+                last_page = parse_last_page(html)
+                if last_page is not None:
+                    return last_page
+    except requests.RequestException:
+        return None
+    return None if needs_browser(html) else 1
 
-            status_label.config(text="Generated links saved to URLs file.")
+def load_watch_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
 
-            
-            if refresh_urls_func:
-                refresh_urls_func()
+def save_watch_state(path, state):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
 
-        except ValueError as e:
-            status_label.config(text=f"Error: {e}")
+def discovery_session(config_path):
+    """A requests session carrying the saved login cookies, if there are any."""
+    from login_utils import load_session
+    from fetch_utils import session_from_cookies
 
-    generate_btn = tb.Button(frame, text="Generate", bootstyle="success outline", command=generate)
-    generate_btn.pack(pady=10)
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    session_path = os.path.join(os.path.dirname(config_path), "session.json")
+    stored = load_session(session_path, config.get("username", ""))
+    if stored is None:
+        return requests.Session()
+    return session_from_cookies(stored["cookies"], stored.get("user_agent"), pool_size=1)
 
-    return frame
+def discover_links(session, url, state, timeout=30):
+    """
+    Returns every page link of the thread, with the page count read from the
+    site. The last page seen on the previous check is the one requested, so
+    a thread that hasn't grown costs that single fetch (and XenForo redirects
+    a page past the end to the real last page). state is updated in place;
+    None is returned if the page count couldn't be read.
+    """
+    base_link = thread_url(url)
+    known = state.get(base_link, {}).get("last_page", 1)
+    last_page = discover_last_page(session, page_url(base_link, known), timeout)
+    if last_page is None:
+        return None
+    state[base_link] = {
+        "last_page": last_page,
+        "previous_last_page": known,
+        "checked_at": time.time(),
+    }
+    return generate_links(base_link, last_page)
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from output_utils import iter_posts, write_json_array
+from throttle_utils import HostLimiters, THROTTLE_STATUSES, retry_after_seconds
+
+ALIVE = "alive"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+# Statuses after which a HEAD is retried as a one-byte ranged GET; plenty of
+# file hosts refuse HEAD or answer it differently from GET
+HEAD_REFUSED = (400, 403, 405, 501)
+DEAD_STATUSES = (404, 410)
+# A link is only recorded dead once a GET agrees with the HEAD
+HEAD_RECHECK = HEAD_REFUSED + DEAD_STATUSES
+
+def link_state(status):
+    """Maps an HTTP status (None for a failed request) to alive/dead/unknown."""
+    if status is None:
+        return UNKNOWN
+    if status < 400:
+        return ALIVE
+    if status in DEAD_STATUSES:
+        return DEAD
+    return UNKNOWN
+
+def get_session(pool_size=32):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def check_link(session, url, limiters, timeout=10, max_retries=2):
+    """
+    Returns the HTTP status of url (None if the request failed) using HEAD,
+    or a ranged GET of its first byte when HEAD is refused or says the link
+    is gone. Waits for a slot
+    on the host's limiter and retries throttled answers after its pause.
+    """
+    limiter = limiters.for_url(url)
+    status = None
+    for _ in range(max_retries + 1):
+        limiter.acquire()
+        start = time.monotonic()
+        status, retry_after = None, None
+        try:
+            response = session.head(url, timeout=timeout, allow_redirects=True)
+            status = response.status_code
+            if status in HEAD_RECHECK:
+                with session.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                                 headers={"Range": "bytes=0-0"}) as response:
+                    status = response.status_code
+            if status in THROTTLE_STATUSES:
+                retry_after = retry_after_seconds(response)
+        except requests.RequestException:
+            pass
+        finally:
+            limiter.release(status, time.monotonic() - start, retry_after)
+        if status not in THROTTLE_STATUSES:
+            break
+    return status
+
+def load_status_cache(path):
+    """Loads {url: [state, status, checked_at]} saved by an earlier run."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_status_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def is_fresh(entry, ttl, now):
+    # Unknown results (timeouts, 5xx, throttling) are always checked again
+    return entry is not None and entry[0] != UNKNOWN and now - entry[2] < ttl
+
+def _interleave_hosts(urls):
+    """Orders urls round-robin by host so one slow host doesn't hold up the pool."""
+    by_host = defaultdict(deque)
+    for url in urls:
+        by_host[urlsplit(url).netloc.lower()].append(url)
+    queues = deque(by_host.values())
+    while queues:
+        q = queues.popleft()
+        yield q.popleft()
+        if q:
+            queues.append(q)
+
+def check_links(urls, cache, ttl=86400, max_workers=32, per_host=4, timeout=10, on_progress=None):
+    """
+    Checks every url whose cached result is missing or older than ttl
+    seconds, max_workers at a time and at most per_host per host (fewer
+    while a host is throttling or slowing down). Results go into cache.
+    Returns how many links were checked.
+    """
+    now = time.time()
+    stale = [url for url in dict.fromkeys(urls) if not is_fresh(cache.get(url), ttl, now)]
+    if not stale:
+        return 0
+    session = get_session(max_workers)
+    limiters = HostLimiters(initial=per_host, maximum=per_host)
+    done = [0]
+    lock = threading.Lock()
+
+    def check(url):
+        status = check_link(session, url, limiters, timeout)
+        cache[url] = [link_state(status), status, time.time()]
+        with lock:
+            done[0] += 1
+            count = done[0]
+        if on_progress:
+            on_progress(count, len(stale))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(check, _interleave_hosts(stale)):
+            pass
+    session.close()
+    return len(stale)
+
+def annotate_posts(posts, cache):
+    """Sets post["link_status"] to {link: state} from the cache, as posts go by."""
+    for post in posts:
+        links = post.get("external_links") or []
+        post["link_status"] = {link: cache[link][0] if link in cache else UNKNOWN for link in links}
+        yield post
+
+def check_file(path, cache_path, ttl=86400, max_workers=32, per_host=4, timeout=10, log_message=print):
+    """
+    Checks the external links of a JSON or JSONL output file and writes each
+    post's results back into it. Results are cached in cache_path, so a
+    re-run only checks links that are new or past the ttl.
+    Returns {"alive", "dead", "unknown", "checked"} counts over the file's links.
+    """
+    links = dict.fromkeys(link for post in iter_posts(path) for link in post.get("external_links") or [])
+    cache = load_status_cache(cache_path)
+    progress_step = max(1, len(links) // 20)
+
+    def progress(done, total):
+        if done % progress_step == 0 or done == total:
+            log_message(f"Checked {done}/{total} links")
+
+    try:
+        checked = check_links(links, cache, ttl, max_workers, per_host, timeout, progress)
+    finally:
+        save_status_cache(cache_path, cache)
+
+    if path.endswith(".jsonl"):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for post in annotate_posts(iter_posts(path), cache):
+                out.write(json.dumps(post, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+    else:
+        write_json_array(annotate_posts(iter_posts(path), cache), path)
+
+    counts = {ALIVE: 0, DEAD: 0, UNKNOWN: 0, "checked": checked}
+    for link in links:
+        counts[cache[link][0] if link in cache else UNKNOWN] += 1
+    return counts
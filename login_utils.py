@@ -1,7 +1,22 @@
+import os
+import json
 import time
-from selenium.webdriver.common.by import By
+import threading
+import requests
+
+BASE_URL = "https://simpcity.cr/"
+# Small members-only page used to check whether stored cookies still work
+SESSION_CHECK_URL = "https://simpcity.cr/account/"
+
+def login_to_simpcity(driver, username, password, timeout=15, timings=None):
+    """
+    Submits the login form on the already-open login page and waits for the
+    account marker instead of a fixed delay. Returns True once logged in.
+    """
+    # Selenium is only loaded once a browser login is actually needed
+    from selenium.webdriver.common.by import By
+    from wait_utils import wait_for_logged_in
 
-def login_to_simpcity(driver, username, password):
     print("Logging in...")
     username_field = driver.find_element(By.NAME, "login")
     password_field = driver.find_element(By.NAME, "password")
@@ -9,5 +24,67 @@ def login_to_simpcity(driver, username, password):
     username_field.send_keys(username)
     password_field.send_keys(password)
     login_button.click()
-    time.sleep(3)
-    print("Login successful.")
+    logged_in = wait_for_logged_in(driver, timeout, timings)
+    print("Login successful." if logged_in else "Login not confirmed before timeout.")
+    return logged_in
+
+def save_session(session_path, cookies, username, user_agent=None):
+    """Stores the authenticated cookies so later runs can skip the browser login."""
+    os.makedirs(os.path.dirname(session_path) or ".", exist_ok=True)
+    tmp_path = f"{session_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "username": username,
+            "user_agent": user_agent,
+            "saved_at": time.time(),
+            "cookies": cookies,
+        }, f, indent=2)
+    os.replace(tmp_path, session_path)
+
+def load_session(session_path, username):
+    """Returns the stored session dict for this user, or None."""
+    try:
+        with open(session_path, "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if session.get("username") != username or not session.get("cookies"):
+        return None
+    return session
+
+def check_session(session, check_url=SESSION_CHECK_URL, timeout=10):
+    """
+    One cheap request to see whether the stored cookies are still logged in.
+    Only the start of the page is read: XenForo marks the <html> tag with
+    data-logged-in="true" for members.
+    """
+    headers = {}
+    if session.get("user_agent"):
+        headers["User-Agent"] = session["user_agent"]
+    cookies = {c["name"]: c["value"] for c in session["cookies"]}
+    try:
+        with requests.get(check_url, cookies=cookies, headers=headers, timeout=timeout,
+                          stream=True, allow_redirects=False) as response:
+            if response.status_code != 200:
+                return False
+            head = next(response.iter_content(4096), b"")
+    except requests.RequestException:
+        return False
+    return b'data-logged-in="true"' in head
+
+def load_valid_session(session_path, username, check_url=SESSION_CHECK_URL):
+    """Returns the stored session if it is still logged in, otherwise None."""
+    session = load_session(session_path, username)
+    if session is not None and check_session(session, check_url):
+        return session
+    return None
+
+def apply_session(driver, session, base_url=BASE_URL):
+    """Loads stored cookies into a fresh driver, which must first visit the site's domain."""
+    driver.get(base_url.rstrip("/") + "/robots.txt")
+    for cookie in session["cookies"]:
+        cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass
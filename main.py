@@ -3,16 +3,8 @@ import webbrowser
 import tkinter as tk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from tkinter import filedialog
 import sys
 
-from config_utils import build_config_frame, build_urls_frame
-from content_generator import build_content_frame
-from link_utils import build_generate_links_frame
-from login_utils import login_to_simpcity
-from image_utils import is_valid_image, get_image_src
-from report_generator import build_report_frame
-
 def main_gui():
     script_dir = os.path.dirname(os.path.realpath(__file__))
     config_path = os.path.join(script_dir, "config", "config.json")
@@ -56,6 +48,9 @@ def main_gui():
     def show_page(page_name):
         for page in pages.values():
             page.pack_forget()
+        if page_name not in pages:
+            # Pages (and the modules behind them) are built on first visit
+            pages[page_name] = page_builders[page_name]()
         pages[page_name].pack(fill="both", expand=True)
 
     
@@ -95,24 +90,39 @@ def main_gui():
 
     pages["home"] = home_page
 
-    config_page = build_config_frame(content_frame, config_path)
-    pages["config"] = config_page
+    def build_config_page():
+        from config_utils import build_config_frame
+        return build_config_frame(content_frame, config_path)
 
-    urls_page = build_urls_frame(content_frame, urls_file)
-    pages["urls"] = urls_page
+    def build_urls_page():
+        from config_utils import build_urls_frame
+        return build_urls_frame(content_frame, urls_file)
 
     def refresh_urls_list():
-        urls_page.refresh_list()
-
-    generate_page = build_generate_links_frame(content_frame, urls_file, refresh_urls_list)
-    pages["generate"] = generate_page
+        # Nothing to refresh until the URL page has been opened; it reads the file when built
+        if "urls" in pages:
+            pages["urls"].refresh_list()
+
+    def build_generate_page():
+        from link_generator import build_generate_links_frame
+        return build_generate_links_frame(content_frame, urls_file, refresh_urls_list)
+
+    def build_content_page():
+        from content_generator import build_content_frame
+        return build_content_frame(content_frame, config_path, urls_file)
+
+    def build_report_page():
+        from report_generator import build_report_frame
+        return build_report_frame(content_frame)
+
+    page_builders = {
+        "config": build_config_page,
+        "urls": build_urls_page,
+        "generate": build_generate_page,
+        "content": build_content_page,
+        "report": build_report_page,
+    }
 
-    content_page = build_content_frame(content_frame, config_path, urls_file)
-    pages["content"] = content_page
-
-    report_page = build_report_frame(content_frame)
-    pages["report"] = report_page
-    
     style_for_button = "success-outline"
 
     tb.Button(sidebar_frame, text="Home", bootstyle=style_for_button, command=lambda: show_page("home")).pack(pady=5, fill="x")
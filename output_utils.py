@@ -0,0 +1,118 @@
+import os
+import json
+import threading
+
+class OrderedJsonlWriter:
+    """
+    Appends posts to a JSONL file, one post per line, as pages finish.
+    Pages may finish in any order; they are written in page order, holding
+    back only the pages that arrive ahead of a gap. `transform`, if given,
+    is called with each page's posts in page order just before they are
+    written.
+    """
+
+    def __init__(self, path, total_pages, transform=None):
+        self.path = path
+        self.total_pages = total_pages
+        self.transform = transform
+        self.posts_written = 0
+        self._next_page = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+
+    def add_page(self, index, posts):
+        with self._lock:
+            self._pending[index] = posts
+            while self._next_page in self._pending:
+                for post in self._transformed(self._pending.pop(self._next_page)):
+                    self._file.write(json.dumps(post, ensure_ascii=False) + "\n")
+                    self.posts_written += 1
+                self._next_page += 1
+            self._file.flush()
+
+    def _transformed(self, posts):
+        return self.transform(posts) if self.transform else posts
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            # Anything still pending is behind a page that never finished
+            for index in sorted(self._pending):
+                for post in self._transformed(self._pending[index]):
+                    self._file.write(json.dumps(post, ensure_ascii=False) + "\n")
+                    self.posts_written += 1
+            self._pending.clear()
+            self._file.close()
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """
+    Yields the items of a JSON array one at a time, reading the file in chunks.
+    `f` must be positioned just after the opening bracket.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            if end < len(buffer) or eof:
+                yield item
+                pos = end
+                continue
+        except json.JSONDecodeError:
+            if eof:
+                raise
+        if eof:
+            return
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+def iter_posts(path):
+    """
+    Yields posts one at a time from either output format: a JSONL file with
+    one post per line, or the JSON array written by json mode.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from _iter_json_array(f)
+            return
+        f.seek(0)
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def write_json_array(posts, json_path):
+    """
+    Writes posts from any iterable as the indented JSON array that json mode
+    produces, one post at a time. Returns the post count.
+    """
+    count = 0
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for post in posts:
+            out.write("[\n  " if count == 0 else ",\n  ")
+            out.write(json.dumps(post, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            count += 1
+        out.write("\n]" if count else "[]")
+    os.replace(tmp_path, json_path)
+    return count
+
+def compact_jsonl(jsonl_path, json_path):
+    """
+    Rewrites a JSONL file as the indented JSON array that json mode produces,
+    streaming it so the posts never all sit in memory. Returns the post count.
+    """
+    return write_json_array(iter_posts(jsonl_path), json_path)
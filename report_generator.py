@@ -1,13 +1,11 @@
 import os
-import json
 import webbrowser
 from tkinter import filedialog
 import ttkbootstrap as tb
-from jinja2 import Environment, FileSystemLoader
 
 def build_report_frame(parent):
     """
-    Returns a Frame for generating an HTML report from a JSON file.
+    Returns a Frame for generating an HTML report from a JSON or JSONL file.
     """
     frame = tb.Frame(parent, bootstyle="dark")
     selected_file_path = ""
@@ -23,7 +21,7 @@ def build_report_frame(parent):
         nonlocal selected_file_path
         file_path = filedialog.askopenfilename(
             title="Select a JSON file",
-            filetypes=(("JSON files", "*.json"), ("All files", "*.*"))
+            filetypes=(("JSON files", "*.json *.jsonl"), ("All files", "*.*"))
         )
         if file_path:
             selected_file_path = file_path
@@ -35,18 +33,11 @@ def build_report_frame(parent):
             return
 
         try:
-            with open(selected_file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            env = Environment(loader=FileSystemLoader('.'))
-            template = env.get_template("template.html")
-            html_content = template.render(posts=data)
-
-            output_filename = os.path.splitext(os.path.basename(selected_file_path))[0] + ".html"
-            output_filepath = os.path.join(os.path.dirname(selected_file_path), output_filename)
-
-            with open(output_filepath, "w", encoding="utf-8") as f:
-                f.write(html_content)
+            # Jinja is only loaded once a report is actually generated
+            from report_utils import render_report
+            posts_per_page = int(page_size_entry.get() or 0)
+            output_filepath = render_report(selected_file_path, posts_per_page)
+            output_filename = os.path.basename(output_filepath)
 
             webbrowser.open('file://' + os.path.realpath(output_filepath))
             file_label.config(text=f"Successfully generated {output_filename}")
@@ -58,6 +49,14 @@ def build_report_frame(parent):
     select_button = tb.Button(frame, text="Select JSON File", bootstyle="primary outline", command=select_file)
     select_button.pack(pady=10)
 
+    # Posts per report page, 0 puts everything on one page
+    page_size_row = tb.Frame(frame, bootstyle="dark")
+    page_size_row.pack(pady=5)
+    tb.Label(page_size_row, text="Posts per page: ").pack(side="left")
+    page_size_entry = tb.Entry(page_size_row, width=10)
+    page_size_entry.insert(0, "500")
+    page_size_entry.pack(side="left", padx=5)
+
     # Button to generate the HTML report
     generate_button = tb.Button(frame, text="Generate HTML Report", bootstyle="success outline", command=generate_report, state="disabled")
     generate_button.pack(pady=10)
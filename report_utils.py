@@ -0,0 +1,91 @@
+import os
+import time
+from itertools import islice
+from jinja2 import Environment, FileSystemLoader
+
+from output_utils import iter_posts
+from search_utils import SearchIndexBuilder
+from trace_utils import add_to_trace_file, trace_path
+
+TEMPLATE_DIR = os.path.dirname(os.path.realpath(__file__))
+_env = None
+
+def get_template():
+    """Returns the report template, compiled once and reused for every report."""
+    global _env
+    if _env is None:
+        _env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+    return _env.get_template("template.html")
+
+def _page_filename(base_name, page):
+    return f"{base_name}_page-{page}.html"
+
+def render_report(input_path, posts_per_page=0):
+    """
+    Renders the HTML report next to the input JSON/JSONL file and returns the
+    path of the file to open. Posts are streamed from the input and the
+    template output is streamed to disk.
+
+    With posts_per_page > 0 the report is split into pages of that many posts
+    with previous/next links, and the returned file is an index of the pages.
+    Only one page of posts is held in memory at a time.
+
+    A search index is built as the posts go by and written to
+    <name>_search.js, which every page loads for its search box.
+
+    The render time is added to the trace of the run that wrote the input,
+    when there is one.
+    """
+    start = time.perf_counter()
+    template = get_template()
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    output_dir = os.path.dirname(input_path)
+    index_path = os.path.join(output_dir, base_name + ".html")
+    search_index_url = base_name + "_search.js"
+    search_index = SearchIndexBuilder()
+    posts = iter_posts(input_path)
+
+    if posts_per_page <= 0:
+        def indexed(posts):
+            for post in posts:
+                search_index.add_post(post)
+                yield post
+
+        template.stream(posts=indexed(posts), search_index_url=search_index_url).dump(index_path, encoding="utf-8")
+        search_index.write_js(os.path.join(output_dir, search_index_url))
+        add_to_trace_file(trace_path(input_path), "report", time.perf_counter() - start,
+                          posts=len(search_index.docs), pages=1)
+        return index_path
+
+    index_pages = []
+    page = 1
+    chunk = list(islice(posts, posts_per_page))
+    while chunk:
+        # Read one page ahead so we know whether there is a next page
+        next_chunk = list(islice(posts, posts_per_page))
+        pagination = {
+            "page": page,
+            "index_url": os.path.basename(index_path),
+            "prev_url": _page_filename(base_name, page - 1) if page > 1 else None,
+            "next_url": _page_filename(base_name, page + 1) if next_chunk else None,
+        }
+        filename = _page_filename(base_name, page)
+        for post in chunk:
+            search_index.add_post(post, filename)
+        template.stream(posts=chunk, pagination=pagination, search_index_url=search_index_url).dump(os.path.join(output_dir, filename), encoding="utf-8")
+
+        index_pages.append({
+            "page": page,
+            "url": filename,
+            "posts": len(chunk),
+            "first_post": chunk[0].get("post_number", ""),
+            "last_post": chunk[-1].get("post_number", ""),
+        })
+        chunk = next_chunk
+        page += 1
+
+    template.stream(posts=[], index_pages=index_pages, search_index_url=search_index_url).dump(index_path, encoding="utf-8")
+    search_index.write_js(os.path.join(output_dir, search_index_url))
+    add_to_trace_file(trace_path(input_path), "report", time.perf_counter() - start,
+                      posts=len(search_index.docs), pages=len(index_pages))
+    return index_path
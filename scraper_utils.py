@@ -1,56 +1,103 @@
 import re
-import time
 import random
-from selenium.webdriver.common.by import By
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, NavigableString, Comment
+
+from classify_utils import default_classifier
+
+# Tags that start a new line in the rendered text, mirroring what Selenium's
+# .text returns for the same element.
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "ol",
+    "p", "pre", "section", "table", "tr", "ul",
+}
+
+TOGGLE_SELECTOR = (
+    "article.message[data-author] .bbCodeBlock--spoiler button, "
+    "article.message[data-author] .spoiler-title, "
+    "article.message[data-author] .js-expandLink"
+)
+
+_EXPAND_SCRIPT = """
+var expanded = 0;
+document.querySelectorAll(arguments[0]).forEach(function (toggle) {
+    try {
+        toggle.click();
+        expanded++;
+    } catch (e) {}
+});
+return expanded;
+"""
 
 def is_real_image(url: str) -> bool:
-    if not url:
-        return False
-    valid_exts = (".jpg", ".jpeg", ".webp")
-    url = url.lower()
-    if not url.endswith(valid_exts):
-        return False
-    # Exclude archive thumbnails and icons
-    if any(ext in url for ext in [".rar.", ".zip.", ".7z.", ".ico"]):
-        return False
-    return True
-
-def scrape_page(driver):
+    return default_classifier.is_real_image(url)
+
+def _absolute_url(base_url, value):
+    """Resolve an attribute value the way the browser's src/href properties do."""
+    if not value:
+        return value
+    value = value.strip()
+    if not base_url:
+        return value
+    if value.startswith("#"):
+        # urljoin drops a bare fragment, the browser keeps it
+        return base_url.split("#")[0] + value
+    return urljoin(base_url, value)
+
+def _normalized_text(tag):
+    return " ".join(tag.get_text().split())
+
+def _first_line(tag):
+    """First non-empty rendered line of an element, like .text.splitlines()[0]."""
+    line = []
+    for node in tag.descendants:
+        if isinstance(node, NavigableString):
+            if not isinstance(node, Comment):
+                line.append(str(node))
+        elif node.name in _BLOCK_TAGS:
+            text = " ".join("".join(line).split())
+            if text:
+                return text
+            line = []
+    return " ".join("".join(line).split())
+
+def extract_posts(html, base_url="", classifier=None):
+    """
+    Builds the posts_data list from a page's HTML without touching the browser.
+    Works on driver.page_source as well as pages fetched over plain HTTP.
+    Links are sorted with `classifier`, the default rules if none is given.
+    """
+    classifier = classifier or default_classifier
+    soup = BeautifulSoup(html, "html.parser")
     posts_data = []
-    posts = driver.find_elements(By.CSS_SELECTOR, "article.message[data-author]")
-
-    for idx, post in enumerate(posts, start=1):
-        # --- Expand spoilers and "click to expand" ---
-        toggles = post.find_elements(By.CSS_SELECTOR, ".bbCodeBlock--spoiler button, .spoiler-title, .js-expandLink")
-        for t in toggles:
-            try:
-                driver.execute_script("arguments[0].click();", t)
-                time.sleep(0.2)  # small delay to let DOM update
-            except:
-                pass
 
+    for post in soup.select("article.message[data-author]"):
         # --- Post title (first line of body) ---
-        try:
-            title = post.find_element(By.CSS_SELECTOR, ".message-body, .bbWrapper").text.splitlines()[0].strip()
-        except:
-            title = ""
-
-        try:
-            post_number = post.find_element(By.XPATH,".//a[starts-with(normalize-space(.), '#')]").text.strip()
-        except:
+        body = post.select_one(".message-body, .bbWrapper")
+        title = _first_line(body) if body is not None else ""
+
+        post_number = None
+        anchors = post.find_all("a")
+        for a in anchors:
+            text = _normalized_text(a)
+            if text.startswith("#"):
+                post_number = text
+                break
+        if post_number is None:
             continue
 
         post_number_clean = re.sub(r"[#,]", "", post_number)
 
         # --- Post date ---
-        try:
-            date = post.find_element(By.CSS_SELECTOR, "time, .message-attribution time").text.strip()
-        except:
-            date = ""
+        time_tag = post.find("time")
+        date = _normalized_text(time_tag) if time_tag is not None else ""
 
         # --- Collect all image URLs ---
-        imgs = [img.get_attribute("src") for img in post.find_elements(By.TAG_NAME, "img") if is_real_image(img.get_attribute("src"))]
-        imgs += [a.get_attribute("href") for a in post.find_elements(By.TAG_NAME, "a") if is_real_image(a.get_attribute("href"))]
+        srcs = [_absolute_url(base_url, img.get("src")) for img in post.find_all("img")]
+        links = [_absolute_url(base_url, a.get("href")) for a in anchors if a.get("href")]
+        imgs = [src for src in srcs if classifier.is_real_image(src)]
+        imgs += [href for href in links if classifier.is_real_image(href)]
         imgs = list(set(imgs))  # deduplicate
 
         # --- If more than 4 images, pick 3 random ones ---
@@ -61,8 +108,7 @@ def scrape_page(driver):
             sample_imgs = imgs
 
         # --- Collect all external links (skip internal forum links) ---
-        links = [a.get_attribute("href") for a in post.find_elements(By.TAG_NAME, "a") if a.get_attribute("href")]
-        external_links = [l for l in links if not re.search(r"simpcity|#|javascript", l, re.I) and not ("jpg6.su" in l and "/img/" in l) and not ("jpg7.cr" in l and "/img/" in l) ]
+        external_links = [l for l in links if classifier.is_external(l)]
 
         posts_data.append({
             "post_number": post_number_clean,
@@ -72,3 +118,34 @@ def scrape_page(driver):
             "external_links": external_links
         })
     return posts_data
+
+def expand_spoilers(driver, settle_timeout=5, timings=None):
+    """
+    Clicks every spoiler and "click to expand" toggle on the page in one
+    injected script, then waits once for the DOM to settle.
+    Returns how many toggles were clicked.
+    """
+    # Imported here so HTML-only extraction doesn't load Selenium
+    from wait_utils import wait_for_dom_stable
+
+    expanded = driver.execute_script(_EXPAND_SCRIPT, TOGGLE_SELECTOR) or 0
+    if expanded:
+        wait_for_dom_stable(driver, timeout=settle_timeout, timings=timings)
+    return expanded
+
+def scrape_page(driver, settle_timeout=5, timings=None, classifier=None, expand=False, fields=None):
+    """
+    Extracts the posts from the page open in the driver. Spoiler content is
+    already in the page source, so toggles are only clicked with expand=True,
+    for pages that load it on demand. A `fields` dict (e.g. a trace phase's)
+    is filled in with the post count and the page source's size in bytes.
+    """
+    if expand:
+        expand_spoilers(driver, settle_timeout, timings)
+
+    # One round-trip for the whole page instead of several per post
+    html = driver.page_source
+    page_data = extract_posts(html, driver.current_url, classifier)
+    if fields is not None:
+        fields.update(posts=len(page_data), bytes=len(html.encode("utf-8")))
+    return page_data
@@ -0,0 +1,87 @@
+import re
+import json
+import time
+from urllib.parse import urlsplit
+
+# Words, numbers and dotted names like host names; the report's search box
+# splits queries with the same pattern.
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+def link_host(url):
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+def _gaps(ids):
+    previous = 0
+    gaps = []
+    for doc_id in ids:
+        gaps.append(doc_id - previous)
+        previous = doc_id
+    return gaps
+
+class SearchIndexBuilder:
+    """
+    Builds an inverted index over post titles, link hosts, post numbers and
+    dates one post at a time, so it can be filled while posts stream into
+    the report. Written out as a small JS file the report loads.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.pages = []
+        self._page_ids = {}
+        self._postings = {}
+        self.build_seconds = 0.0
+
+    def add_post(self, post, page_url=""):
+        start = time.perf_counter()
+        doc_id = len(self.docs)
+        if page_url not in self._page_ids:
+            self._page_ids[page_url] = len(self.pages)
+            self.pages.append(page_url)
+
+        title = post.get("title", "")
+        post_number = str(post.get("post_number", ""))
+        self.docs.append([post_number, title[:80], self._page_ids[page_url]])
+
+        tokens = set(tokenize(title))
+        tokens.update(tokenize(post.get("date", "")))
+        if post_number:
+            tokens.add(post_number.lower())
+        for link in post.get("external_links", []):
+            host = link_host(link)
+            if host:
+                tokens.add(host)
+                tokens.update(host.split("."))
+
+        for token in tokens:
+            self._postings.setdefault(token, []).append(doc_id)
+        self.build_seconds += time.perf_counter() - start
+
+    def to_dict(self):
+        terms = sorted(self._postings)
+        return {
+            "pages": self.pages,
+            "docs": self.docs,
+            # Sorted so the search box can binary-search for prefixes
+            "terms": terms,
+            # Doc ids are stored as gaps from the previous id, which keeps long lists short
+            "postings": [_gaps(self._postings[t]) for t in terms],
+        }
+
+    def write_js(self, path):
+        """Writes the index as a script assigning window.SEARCH_INDEX. Returns its size in bytes."""
+        start = time.perf_counter()
+        data = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("window.SEARCH_INDEX = ")
+            f.write(data)
+            f.write(";\n")
+        self.build_seconds += time.perf_counter() - start
+        return len(data.encode("utf-8"))
@@ -0,0 +1,183 @@
+import time
+import sqlite3
+import threading
+from output_utils import write_json_array
+from search_utils import link_host
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    thread_id INTEGER NOT NULL REFERENCES threads(id),
+    post_number INTEGER NOT NULL,
+    date TEXT,
+    title TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (thread_id, post_number)
+);
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    post_id INTEGER NOT NULL REFERENCES posts(id),
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    thumbnail TEXT,
+    UNIQUE (post_id, url)
+);
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    post_id INTEGER NOT NULL REFERENCES posts(id),
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    UNIQUE (post_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_links_host ON links (host);
+CREATE INDEX IF NOT EXISTS idx_links_first_seen ON links (first_seen);
+"""
+# posts(thread_id, post_number) and images/links(post_id, ...) are already
+# covered by the indexes behind their UNIQUE constraints.
+
+class PostStore:
+    """
+    SQLite storage for scraped posts, their sample images and external links.
+    Safe to share between scraping threads; every write is one transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._thread_ids = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _thread_id(self, name):
+        if name not in self._thread_ids:
+            self._conn.execute("INSERT OR IGNORE INTO threads (name) VALUES (?)", (name,))
+            row = self._conn.execute("SELECT id FROM threads WHERE name = ?", (name,)).fetchone()
+            self._thread_ids[name] = row[0]
+        return self._thread_ids[name]
+
+    def store_posts(self, thread, posts):
+        """
+        Bulk-inserts one batch of posts (usually a page) in a single transaction.
+        Posts already stored are updated: links still in the post keep the
+        time they were first seen, links no longer in it are removed.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            thread_id = self._thread_id(thread)
+            for post in posts:
+                try:
+                    post_number = int(post["post_number"])
+                except (KeyError, ValueError):
+                    continue
+                self._conn.execute(
+                    "INSERT INTO posts (thread_id, post_number, date, title, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (thread_id, post_number) DO UPDATE SET "
+                    "date = excluded.date, title = excluded.title, last_seen = excluded.last_seen",
+                    (thread_id, post_number, post.get("date", ""), post.get("title", ""), now, now),
+                )
+                post_id = self._conn.execute(
+                    "SELECT id FROM posts WHERE thread_id = ? AND post_number = ?", (thread_id, post_number)
+                ).fetchone()[0]
+
+                # sample_images is a fresh random sample each scrape, so it replaces the old one
+                thumbnails = post.get("thumbnails") or []
+                self._conn.execute("DELETE FROM images WHERE post_id = ?", (post_id,))
+                self._conn.executemany(
+                    "INSERT INTO images (post_id, position, url, thumbnail) VALUES (?, ?, ?, ?)",
+                    [
+                        (post_id, i, url, thumbnails[i] if i < len(thumbnails) else None)
+                        for i, url in enumerate(post.get("sample_images", []))
+                    ],
+                )
+                links = post.get("external_links", [])
+                # Links edited out of the post since the last scrape
+                stale = {url for (url,) in self._conn.execute("SELECT url FROM links WHERE post_id = ?", (post_id,))}
+                stale.difference_update(links)
+                self._conn.executemany(
+                    "DELETE FROM links WHERE post_id = ? AND url = ?", [(post_id, url) for url in stale]
+                )
+                self._conn.executemany(
+                    "INSERT INTO links (post_id, position, url, host, first_seen) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (post_id, url) DO UPDATE SET position = excluded.position",
+                    [(post_id, i, url, link_host(url), now) for i, url in enumerate(links)],
+                )
+
+    def iter_posts(self, thread, after_post=None):
+        """Yields a thread's posts in post order as the usual post dicts."""
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+        try:
+            query = (
+                "SELECT p.id, p.post_number, p.date, p.title FROM posts p "
+                "JOIN threads t ON t.id = p.thread_id WHERE t.name = ?"
+            )
+            params = [thread]
+            if after_post is not None:
+                query += " AND p.post_number > ?"
+                params.append(int(after_post))
+            query += " ORDER BY p.post_number"
+
+            for post_id, post_number, date, title in conn.execute(query, params):
+                images = conn.execute(
+                    "SELECT url, thumbnail FROM images WHERE post_id = ? ORDER BY position", (post_id,)
+                ).fetchall()
+                links = conn.execute(
+                    "SELECT url FROM links WHERE post_id = ? ORDER BY position", (post_id,)
+                ).fetchall()
+                post = {
+                    "post_number": str(post_number),
+                    "date": date,
+                    "title": title,
+                    "sample_images": [url for url, _ in images],
+                    "external_links": [url for (url,) in links],
+                }
+                if any(thumb for _, thumb in images):
+                    post["thumbnails"] = [thumb for _, thumb in images]
+                yield post
+        finally:
+            conn.close()
+
+    def export_json(self, thread, json_path):
+        """Writes a thread back out in the JSON format report_generator reads."""
+        return write_json_array(self.iter_posts(thread), json_path)
+
+    def new_links_since(self, since, thread=None, host=None):
+        """(thread, post_number, url) for links first seen at or after the `since` timestamp."""
+        query = (
+            "SELECT t.name, p.post_number, l.url FROM links l "
+            "JOIN posts p ON p.id = l.post_id JOIN threads t ON t.id = p.thread_id "
+            "WHERE l.first_seen >= ?"
+        )
+        params = [since]
+        if thread is not None:
+            query += " AND t.name = ?"
+            params.append(thread)
+        if host is not None:
+            query += " AND l.host = ?"
+            params.append(host)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY l.first_seen", params).fetchall()
+
+    def links_by_host(self, host):
+        """(thread, post_number, url) for every stored link on the given host."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT t.name, p.post_number, l.url FROM links l "
+                "JOIN posts p ON p.id = l.post_id JOIN threads t ON t.id = p.thread_id "
+                "WHERE l.host = ?",
+                (host,),
+            ).fetchall()
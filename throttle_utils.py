@@ -0,0 +1,158 @@
+import time
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fetch_utils import needs_browser
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for one host that adjusts itself (additive increase,
+    multiplicative decrease). A 429/503 halves the limit and pauses the host
+    for Retry-After; a failed request (status None), any other 5xx or
+    latency well above the healthy baseline lowers it by one; once a full
+    limit's worth of requests in a row came back healthy, it goes up by one.
+    Only healthy responses feed the latency baseline.
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=8, latency_factor=3.0):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline = None
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.peak_limit = self.limit
+        self._healthy_streak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, status, seconds, retry_after=None):
+        with self._cond:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self.limit = max(self.minimum, self.limit // 2)
+                self._healthy_streak = 0
+                pause = retry_after if retry_after is not None else 1.0
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif (status is None or status >= 500
+                  or (self.baseline is not None and seconds > self.baseline * self.latency_factor)):
+                # Dropped connections and server errors are often fast; they
+                # must not count as healthy or pull the baseline down
+                self.limit = max(self.minimum, self.limit - 1)
+                self._healthy_streak = 0
+            else:
+                # Slow-moving average of healthy response times
+                self.baseline = seconds if self.baseline is None else self.baseline * 0.9 + seconds * 0.1
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._healthy_streak = 0
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self._cond.notify_all()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "peak_limit": self.peak_limit,
+            "throttled": self.throttled,
+            "baseline_seconds": round(self.baseline, 3) if self.baseline is not None else None,
+        }
+
+class HostLimiters:
+    """One AdaptiveLimiter per host, created on first use."""
+
+    def __init__(self, initial=2, maximum=8):
+        self.initial = initial
+        self.maximum = maximum
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = AdaptiveLimiter(self.initial, maximum=self.maximum)
+            return limiter
+
+    def stats(self):
+        with self._lock:
+            return {host: limiter.stats() for host, limiter in self._limiters.items()}
+
+def retry_after_seconds(response):
+    """The response's Retry-After in seconds (capped at a minute), or None."""
+    try:
+        return min(60.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+def fetch_page_adaptive(session, url, limiters, timeout=30, max_retries=5, trace=None):
+    """
+    Like fetch_utils.fetch_page, but waits for a slot on the host's limiter
+    and retries throttled responses after the host's pause.
+    Returns the HTML, or None if the page has to go through the browser.
+    """
+    limiter = limiters.for_url(url)
+    for _ in range(max_retries + 1):
+        limiter.acquire()
+        start = time.monotonic()
+        status, retry_after, html, size = None, None, None, 0
+        try:
+            response = session.get(url, timeout=timeout)
+            status, size = response.status_code, len(response.content)
+            if status in THROTTLE_STATUSES:
+                retry_after = retry_after_seconds(response)
+            elif status == 200:
+                html = response.text
+        except requests.RequestException:
+            pass
+        finally:
+            seconds = time.monotonic() - start
+            limiter.release(status, seconds, retry_after)
+            if trace is not None:
+                trace.record("fetch", seconds, url, bytes=size, status=status)
+        if status not in THROTTLE_STATUSES:
+            break
+    if html is None or needs_browser(html):
+        return None
+    return html
+
+class SharedFetcher:
+    """
+    A single pool of HTTP workers shared by every job in a batch, with
+    per-host adaptive limits deciding how many requests really run at once.
+    fetch_pages(urls, trace) has the same contract as fetch_utils.fetch_pages.
+    """
+
+    def __init__(self, session, max_workers=16, initial=2, max_per_host=8, timeout=30):
+        self.session = session
+        self.timeout = timeout
+        self.limiters = HostLimiters(initial, max_per_host)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def fetch_pages(self, urls, trace=None):
+        futures = [self._executor.submit(fetch_page_adaptive, self.session, url, self.limiters, self.timeout,
+                                         trace=trace)
+                   for url in urls]
+        for url, future in zip(urls, futures):
+            yield url, future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
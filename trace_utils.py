@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # memory figures are optional
+    psutil = None
+
+TRACE_VERSION = 1
+
+# Order phases are listed in the summary and the trace file
+PHASES = (
+    "login", "fetch", "navigation", "wait", "spoilers", "extraction",
+    "images", "thumbnails", "cache", "sqlite", "write", "link_check", "report",
+)
+
+# WebDriver properties that are a round-trip to the browser, like its methods
+_DRIVER_PROPERTIES = {"page_source", "current_url", "title", "window_handles", "current_window_handle"}
+
+def trace_path(output_path):
+    """Where the trace of the run that wrote output_path is kept: traces/<name>.trace.json next to it."""
+    base_name = os.path.splitext(os.path.basename(output_path))[0]
+    return os.path.join(os.path.dirname(output_path), "traces", base_name + ".trace.json")
+
+def process_memory_mb():
+    """Resident memory of this process, or None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+class RunTrace:
+    """
+    Timings and counters for one content generation run. Phases are timed
+    per page (keyed by URL) from any thread; pages also collect bytes
+    fetched, WebDriver calls and memory samples. phase_totals() sums the
+    phases, to_dict() is the whole trace as written to the trace file.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.wall_seconds = None
+        self.info = {}
+        # The run's page URLs, for page numbers in the trace
+        self.urls = []
+        self.events = []
+        self.driver_calls = {}
+        self.memory = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase, seconds, page=None, **fields):
+        """Adds a `phase` event that just ended after `seconds`."""
+        at = time.perf_counter() - self._start - seconds
+        event = {"phase": phase, "page": page, "at": at, "seconds": seconds, **fields}
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def phase(self, phase, page=None, **fields):
+        """
+        Times the block as one `phase` event. The yielded dict can be filled
+        in with extra fields (posts, bytes, ...) before the block ends.
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(phase, time.perf_counter() - start, page, **fields)
+
+    def count_driver_call(self, page=None):
+        with self._lock:
+            self.driver_calls[page] = self.driver_calls.get(page, 0) + 1
+
+    def sample_memory(self, page, browser_mb=None):
+        """Records the process's (and optionally the browser's) memory once a page is done."""
+        rss_mb = process_memory_mb()
+        with self._lock:
+            sample = self.memory.setdefault(page, {"rss_mb": None, "browser_mb": None})
+            sample["rss_mb"] = rss_mb
+            if browser_mb is not None:
+                sample["browser_mb"] = browser_mb
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._start
+
+    def phase_totals(self):
+        """{phase: {"count", "seconds", "max_seconds", "bytes", "posts"}} in PHASES order."""
+        totals = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            entry = totals.setdefault(event["phase"], {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0, "posts": 0})
+            entry["count"] += 1
+            entry["seconds"] += event["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], event["seconds"])
+            entry["bytes"] += event.get("bytes") or 0
+            entry["posts"] += event.get("posts") or 0
+        order = {phase: n for n, phase in enumerate(PHASES)}
+        return dict(sorted(totals.items(), key=lambda item: order.get(item[0], len(PHASES))))
+
+    def page_stats(self):
+        """One dict per page that has events, in page order: seconds per phase, bytes, driver calls, memory."""
+        pages = {}
+        with self._lock:
+            events = list(self.events)
+            driver_calls = dict(self.driver_calls)
+            memory = {url: dict(sample) for url, sample in self.memory.items()}
+        for event in events:
+            if event["page"] is None:
+                continue
+            page = pages.setdefault(event["page"], {"url": event["page"], "seconds": {}, "bytes": 0, "posts": None})
+            page["seconds"][event["phase"]] = round(page["seconds"].get(event["phase"], 0.0) + event["seconds"], 4)
+            page["bytes"] += event.get("bytes") or 0
+            if "posts" in event:
+                page["posts"] = event["posts"]
+        for url, page in pages.items():
+            page["driver_calls"] = driver_calls.get(url, 0)
+            for key, mb in (memory.get(url) or {}).items():
+                page[key] = round(mb, 1) if mb is not None else None
+        position = {url: n for n, url in enumerate(self.urls)}
+        ordered = sorted(pages.values(), key=lambda page: position.get(page["url"], len(position)))
+        for page in ordered:
+            if page["url"] in position:
+                page["page"] = position[page["url"]] + 1
+        return ordered
+
+    def to_dict(self):
+        with self._lock:
+            events = list(self.events)
+            driver_calls = dict(self.driver_calls)
+            memory = list(self.memory.values())
+        rss = [sample["rss_mb"] for sample in memory if sample["rss_mb"] is not None]
+        browser = [sample["browser_mb"] for sample in memory if sample["browser_mb"] is not None]
+        phases = {
+            phase: {
+                "count": entry["count"],
+                "seconds": round(entry["seconds"], 4),
+                "mean_ms": round(entry["seconds"] / entry["count"] * 1000, 2),
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "bytes": entry["bytes"],
+                "posts": entry["posts"],
+            }
+            for phase, entry in self.phase_totals().items()
+        }
+        return {
+            "version": TRACE_VERSION,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(self.wall_seconds, 3) if self.wall_seconds is not None else None,
+            **self.info,
+            "driver_calls": sum(driver_calls.values()),
+            "peak_rss_mb": round(max(rss), 1) if rss else None,
+            "peak_browser_mb": round(max(browser), 1) if browser else None,
+            "phases": phases,
+            "pages": self.page_stats(),
+            "events": [
+                {**event, "at": round(event["at"], 4), "seconds": round(event["seconds"], 4)}
+                for event in events
+            ],
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+def add_to_trace_file(path, phase, seconds, **fields):
+    """
+    Adds one event (e.g. a report render done after the run) to an existing
+    trace file and its phase totals. Does nothing when there is no trace.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            trace = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+    # Done after the run, so it has no offset into it
+    trace["events"].append({"phase": phase, "page": None, "at": None, "seconds": round(seconds, 4), **fields})
+    entry = trace["phases"].setdefault(phase, {"count": 0, "seconds": 0.0, "mean_ms": 0.0, "max_ms": 0.0, "bytes": 0, "posts": 0})
+    entry["count"] += 1
+    entry["seconds"] = round(entry["seconds"] + seconds, 4)
+    entry["mean_ms"] = round(entry["seconds"] / entry["count"] * 1000, 2)
+    entry["max_ms"] = max(entry["max_ms"], round(seconds * 1000, 2))
+    entry["posts"] += fields.get("posts") or 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=1)
+    os.replace(tmp_path, path)
+    return True
+
+def _size(num_bytes):
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    return f"{num_bytes / 1024:.0f} KB"
+
+def summarize_trace(trace):
+    """
+    Multi-line summary of a RunTrace (or a loaded trace file) for the log:
+    one line per phase, then driver calls and memory.
+    """
+    data = trace.to_dict() if isinstance(trace, RunTrace) else trace
+    phases = data["phases"]
+    if not phases:
+        return "Nothing was timed."
+    # Phases overlap when pages run in parallel, so shares are of the summed phase time
+    phase_total = sum(entry["seconds"] for entry in phases.values()) or 1.0
+    lines = [f"Run took {data['wall_seconds']:.1f}s; time by phase (summed over workers):"
+             if data.get("wall_seconds") is not None else "Time by phase (summed over workers):"]
+    for phase, entry in phases.items():
+        line = (
+            f"  {phase:<11} {entry['seconds']:8.2f}s {entry['seconds'] / phase_total:4.0%}"
+            f"  {entry['count']:>5}x  avg {entry['mean_ms']:.0f} ms  max {entry['max_ms']:.0f} ms"
+        )
+        if entry.get("bytes"):
+            line += f"  {_size(entry['bytes'])}"
+        if phase == "extraction" and entry.get("posts"):
+            line += f"  {entry['seconds'] / entry['posts'] * 1000:.2f} ms/post"
+        lines.append(line)
+    pages = [page for page in data["pages"] if "page" in page]
+    extra = []
+    if data["driver_calls"]:
+        per_page = f" ({data['driver_calls'] / len(pages):.1f} per page)" if pages else ""
+        extra.append(f"{data['driver_calls']} driver calls{per_page}")
+    if data.get("peak_rss_mb") is not None:
+        extra.append(f"peak memory {data['peak_rss_mb']:.0f} MB")
+    if data.get("peak_browser_mb") is not None:
+        extra.append(f"browser {data['peak_browser_mb']:.0f} MB")
+    if pages:
+        slowest = max(pages, key=lambda page: sum(page["seconds"].values()))
+        extra.append(f"slowest page {slowest['page']} ({sum(slowest['seconds'].values()):.2f}s)")
+    if extra:
+        lines.append("  " + ", ".join(extra))
+    return "\n".join(lines)
+
+class CountingDriver:
+    """
+    Passes everything through to a WebDriver and counts the calls made on
+    it (methods and round-trip properties such as page_source) against the
+    page set in .page, None while logging in.
+    """
+
+    def __init__(self, driver, trace):
+        self.__dict__["_driver"] = driver
+        self.__dict__["_trace"] = trace
+        self.__dict__["page"] = None
+
+    def __getattr__(self, name):
+        value = getattr(self._driver, name)
+        if name in _DRIVER_PROPERTIES:
+            self._trace.count_driver_call(self.page)
+            return value
+        if not callable(value) or name.startswith("_"):
+            return value
+
+        def call(*args, **kwargs):
+            self._trace.count_driver_call(self.page)
+            return value(*args, **kwargs)
+        return call
+
+    def __setattr__(self, name, value):
+        if name == "page":
+            self.__dict__["page"] = value
+        else:
+            setattr(self._driver, name, value)
@@ -0,0 +1,148 @@
+import os
+
+# Rewrite the file once blanked-out lines take up more than this many bytes
+# and more than the live URLs themselves
+COMPACT_MIN_BYTES = 64 * 1024
+
+def split_urls(text):
+    """Splits pasted or imported text into URLs, one per line or separated by spaces."""
+    return [u for u in text.split() if u]
+
+class UrlList:
+    """
+    In-memory model of urls.txt that writes each edit straight to disk.
+
+    Added URLs are appended to the end of the file and deleted ones are
+    overwritten with spaces in place, so an edit only touches the bytes it
+    changes. Readers of urls.txt already skip blank lines. The file is
+    rewritten without the blanks once they outweigh the live URLs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.load()
+
+    def load(self):
+        """(Re)reads the file, e.g. after something else has rewritten it."""
+        self.urls = []
+        self._spans = []  # (byte offset, byte length) of each URL in the file
+        self._dead_bytes = 0
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            text = line.rstrip(b"\r\n")
+            url = text.strip()
+            if url:
+                start = offset + (len(text) - len(text.lstrip()))
+                self.urls.append(url.decode("utf-8", "replace"))
+                self._spans.append((start, len(url)))
+                self._dead_bytes += len(text) - len(url)
+            else:
+                self._dead_bytes += len(text)
+            offset += len(line)
+        self._size = offset
+        self._ends_with_newline = data.endswith(b"\n") or not data
+        self._mtime = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _check_unchanged(self):
+        """Reloads the file if another writer (link generation, the CLI) replaced it. Returns True if it did."""
+        if self._stat() != self._mtime:
+            self.load()
+            return True
+        return False
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __getitem__(self, index):
+        return self.urls[index]
+
+    def add(self, urls):
+        """Appends the URLs in one write. Returns how many were added."""
+        urls = [u.strip() for u in urls if u.strip()]
+        if not urls:
+            return 0
+        self._check_unchanged()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        chunk = b"" if self._ends_with_newline else b"\n"
+        offset = self._size + len(chunk)
+        for url in urls:
+            encoded = url.encode("utf-8")
+            self.urls.append(url)
+            self._spans.append((offset, len(encoded)))
+            chunk += encoded + b"\n"
+            offset += len(encoded) + 1
+        with open(self.path, "ab") as f:
+            f.write(chunk)
+        self._size = offset
+        self._ends_with_newline = True
+        self._mtime = self._stat()
+        return len(urls)
+
+    def import_file(self, path, skip_existing=True):
+        """Adds the URLs listed in another text file. Returns how many were added."""
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            urls = split_urls(f.read())
+        if skip_existing:
+            seen = set(self.urls)
+            fresh = []
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    fresh.append(url)
+            urls = fresh
+        return self.add(urls)
+
+    def delete(self, indexes):
+        """
+        Removes the URLs at the given positions. Returns how many were
+        removed, or None when urls.txt changed on disk since it was loaded:
+        the positions no longer match, so nothing is deleted and the list is
+        reloaded for the caller to show again.
+        """
+        if self._check_unchanged():
+            return None
+        indexes = sorted({i for i in indexes if 0 <= i < len(self.urls)})
+        if not indexes:
+            return 0
+        with open(self.path, "r+b") as f:
+            for i in indexes:
+                start, length = self._spans[i]
+                f.seek(start)
+                f.write(b" " * length)
+                self._dead_bytes += length
+        removed = set(indexes)
+        if len(indexes) == 1:
+            del self.urls[indexes[0]]
+            del self._spans[indexes[0]]
+        else:
+            self.urls = [u for i, u in enumerate(self.urls) if i not in removed]
+            self._spans = [s for i, s in enumerate(self._spans) if i not in removed]
+        self._mtime = self._stat()
+        if self._dead_bytes > COMPACT_MIN_BYTES and self._dead_bytes > self._size - self._dead_bytes:
+            self.compact()
+        return len(indexes)
+
+    def clear(self):
+        self.urls = []
+        self.compact()
+
+    def compact(self):
+        """Rewrites the file with just the live URLs."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for url in self.urls:
+                f.write(url + "\n")
+        os.replace(tmp_path, self.path)
+        self.load()
@@ -0,0 +1,86 @@
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+POSTS_SELECTOR = "article.message[data-author]"
+LOGIN_FORM_SELECTOR = "input[name='login']"
+# XenForo flags the <html> tag and shows the account menu once a member is signed in
+LOGGED_IN_SELECTOR = "html[data-logged-in='true'], .p-navgroup--member"
+
+# Resolves once nothing in the document has changed for `quiet` ms,
+# or with false when `limit` ms pass without the page settling.
+_DOM_STABLE_SCRIPT = """
+const quiet = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+const start = Date.now();
+let timer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    if (Date.now() - start > limit) {
+        observer.disconnect();
+        done(false);
+    } else {
+        timer = setTimeout(finish, quiet);
+    }
+});
+function finish() {
+    observer.disconnect();
+    done(true);
+}
+observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+timer = setTimeout(finish, quiet);
+"""
+
+def _record(timings, name, start, ready):
+    elapsed = time.perf_counter() - start
+    if timings is not None:
+        timings.append({"wait": name, "seconds": round(elapsed, 3), "ready": ready})
+    return ready
+
+def wait_for_selector(driver, selector, timeout=15, name=None, timings=None):
+    """
+    Waits until an element matching the CSS selector is present.
+    Returns True when it appeared, False when the timeout ran out.
+    """
+    start = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        )
+        ready = True
+    except TimeoutException:
+        ready = False
+    return _record(timings, name or selector, start, ready)
+
+def wait_for_posts(driver, timeout=15, timings=None):
+    return wait_for_selector(driver, POSTS_SELECTOR, timeout, "posts", timings)
+
+def wait_for_login_form(driver, timeout=15, timings=None):
+    return wait_for_selector(driver, LOGIN_FORM_SELECTOR, timeout, "login_form", timings)
+
+def wait_for_logged_in(driver, timeout=15, timings=None):
+    return wait_for_selector(driver, LOGGED_IN_SELECTOR, timeout, "logged_in", timings)
+
+def wait_for_dom_stable(driver, quiet_ms=300, timeout=5, timings=None):
+    """Waits until the DOM stops mutating for quiet_ms, up to timeout seconds."""
+    start = time.perf_counter()
+    try:
+        driver.set_script_timeout(timeout + 1)
+        ready = bool(driver.execute_async_script(_DOM_STABLE_SCRIPT, quiet_ms, int(timeout * 1000)))
+    except WebDriverException:
+        ready = False
+    return _record(timings, "dom_stable", start, ready)
+
+def summarize_waits(timings):
+    """One-line summary of recorded waits for the log."""
+    if not timings:
+        return "No waits recorded."
+    total = sum(t["seconds"] for t in timings)
+    slowest = max(timings, key=lambda t: t["seconds"])
+    timed_out = sum(1 for t in timings if not t["ready"])
+    return (
+        f"Waited {total:.1f}s over {len(timings)} waits "
+        f"(avg {total / len(timings):.2f}s, slowest {slowest['wait']} {slowest['seconds']:.2f}s, "
+        f"{timed_out} timed out)"
+    )